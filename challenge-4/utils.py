@@ -8,14 +8,19 @@ of lazy evaluation operations.
 import time
 import gc
 import tracemalloc
+from collections import deque
 from typing import List, Dict, Any, Optional
 from lazy import LazyCollection
 
 
+# Per-operation records kept for inspection; totals below are tracked
+# separately, so evicting old records never skews the summary
+MAX_RECORDED_OPERATIONS = 10_000
+
 # Global performance tracking
 _performance_metrics = {
-    "operations": [],
-    "total_time_ms": 0.0,
+    "operations": deque(maxlen=MAX_RECORDED_OPERATIONS),
+    "total_time_ns": 0,
     "total_memory_mb": 0.0,
     "operation_count": 0
 }
@@ -28,16 +33,16 @@ def measure_performance(operation_name: str, func, *args, **kwargs) -> Dict[str,
     tracemalloc.start()
     gc.collect()
     
-    # Start timing
-    start_time = time.perf_counter()
+    # Start timing (integer nanoseconds; converted to ms once per record)
+    t0 = time.perf_counter_ns()
     
     try:
         # Execute function
         result = func(*args, **kwargs)
         
         # End timing
-        end_time = time.perf_counter()
-        execution_time_ms = (end_time - start_time) * 1000
+        execution_time_ns = time.perf_counter_ns() - t0
+        execution_time_ms = execution_time_ns / 1_000_000
         
         # Get memory info
         current, peak = tracemalloc.get_traced_memory()
@@ -46,6 +51,7 @@ def measure_performance(operation_name: str, func, *args, **kwargs) -> Dict[str,
         # Track metrics
         performance_info = {
             "operation": operation_name,
+            "execution_time_ns": execution_time_ns,
             "execution_time_ms": execution_time_ms,
             "memory_usage_mb": memory_mb,
             "success": True,
@@ -55,7 +61,7 @@ def measure_performance(operation_name: str, func, *args, **kwargs) -> Dict[str,
         
         # Add to global metrics
         _performance_metrics["operations"].append(performance_info)
-        _performance_metrics["total_time_ms"] += execution_time_ms
+        _performance_metrics["total_time_ns"] += execution_time_ns
         _performance_metrics["total_memory_mb"] += memory_mb
         _performance_metrics["operation_count"] += 1
         
@@ -63,8 +69,8 @@ def measure_performance(operation_name: str, func, *args, **kwargs) -> Dict[str,
         
     except Exception as e:
         # End timing even on error
-        end_time = time.perf_counter()
-        execution_time_ms = (end_time - start_time) * 1000
+        execution_time_ns = time.perf_counter_ns() - t0
+        execution_time_ms = execution_time_ns / 1_000_000
         
         # Get memory info
         current, peak = tracemalloc.get_traced_memory()
@@ -72,6 +78,7 @@ def measure_performance(operation_name: str, func, *args, **kwargs) -> Dict[str,
         
         performance_info = {
             "operation": operation_name,
+            "execution_time_ns": execution_time_ns,
             "execution_time_ms": execution_time_ms,
             "memory_usage_mb": memory_mb,
             "success": False,
@@ -81,7 +88,7 @@ def measure_performance(operation_name: str, func, *args, **kwargs) -> Dict[str,
         
         # Add to global metrics
         _performance_metrics["operations"].append(performance_info)
-        _performance_metrics["total_time_ms"] += execution_time_ms
+        _performance_metrics["total_time_ns"] += execution_time_ns
         _performance_metrics["total_memory_mb"] += memory_mb
         _performance_metrics["operation_count"] += 1
         
@@ -102,11 +109,12 @@ def get_performance_summary() -> Dict[str, Any]:
             "avg_memory_mb": 0.0
         }
     
+    total_time_ms = _performance_metrics["total_time_ns"] / 1_000_000
     return {
         "total_operations": _performance_metrics["operation_count"],
-        "total_time_ms": _performance_metrics["total_time_ms"],
+        "total_time_ms": total_time_ms,
         "total_memory_mb": _performance_metrics["total_memory_mb"],
-        "avg_time_ms": _performance_metrics["total_time_ms"] / _performance_metrics["operation_count"],
+        "avg_time_ms": total_time_ms / _performance_metrics["operation_count"],
         "avg_memory_mb": _performance_metrics["total_memory_mb"] / _performance_metrics["operation_count"]
     }
 
@@ -115,8 +123,8 @@ def clear_performance_metrics():
     """Clear all performance metrics"""
     global _performance_metrics
     _performance_metrics = {
-        "operations": [],
-        "total_time_ms": 0.0,
+        "operations": deque(maxlen=MAX_RECORDED_OPERATIONS),
+        "total_time_ns": 0,
         "total_memory_mb": 0.0,
         "operation_count": 0
     }
@@ -228,7 +236,7 @@ def process_lazy_operations(source_data: List[Any], operations: List[Dict],
                           enable_caching: bool = False) -> Dict[str, Any]:
     """Process a sequence of lazy operations"""
     
-    start_time = time.perf_counter()
+    t0 = time.perf_counter_ns()
     
     try:
         # Create lazy collection
@@ -273,8 +281,7 @@ def process_lazy_operations(source_data: List[Any], operations: List[Dict],
         memory_mb = peak / 1024 / 1024
         tracemalloc.stop()
         
-        end_time = time.perf_counter()
-        processing_time_ms = (end_time - start_time) * 1000
+        processing_time_ms = (time.perf_counter_ns() - t0) / 1_000_000
         
         return {
             "result": result,
@@ -290,8 +297,7 @@ def process_lazy_operations(source_data: List[Any], operations: List[Dict],
         }
         
     except Exception as e:
-        end_time = time.perf_counter()
-        processing_time_ms = (end_time - start_time) * 1000
+        processing_time_ms = (time.perf_counter_ns() - t0) / 1_000_000
         
         return {
             "error": str(e),
@@ -307,7 +313,7 @@ def process_pagination(source_data: List[Any], page_number: int, page_size: int,
                       operations: Optional[List[Dict]] = None) -> Dict[str, Any]:
     """Process pagination with optional operations"""
     
-    start_time = time.perf_counter()
+    t0 = time.perf_counter_ns()
     
     try:
         # Create lazy collection
@@ -344,8 +350,7 @@ def process_pagination(source_data: List[Any], page_number: int, page_size: int,
         memory_mb = peak / 1024 / 1024
         tracemalloc.stop()
         
-        end_time = time.perf_counter()
-        processing_time_ms = (end_time - start_time) * 1000
+        processing_time_ms = (time.perf_counter_ns() - t0) / 1_000_000
         
         # Calculate pagination info
         has_next_page = len(page_data) == page_size  # Simple heuristic
@@ -368,8 +373,7 @@ def process_pagination(source_data: List[Any], page_number: int, page_size: int,
         }
         
     except Exception as e:
-        end_time = time.perf_counter()
-        processing_time_ms = (end_time - start_time) * 1000
+        processing_time_ms = (time.perf_counter_ns() - t0) / 1_000_000
         
         return {
             "error": str(e),
@@ -386,13 +390,14 @@ def process_chunking(source_data: List[Any], chunk_size: int, max_chunks: Option
                     operations: Optional[List[Dict]] = None) -> Dict[str, Any]:
     """Process chunking with optional operations"""
     
-    start_time = time.perf_counter()
+    t0 = time.perf_counter_ns()
     
     try:
         # Create lazy collection
         lazy_col = LazyCollection(source_data)
         
         operations_applied = []
+        has_filter = False
         
         # Apply operations if provided
         if operations:
@@ -409,6 +414,7 @@ def process_chunking(source_data: List[Any], chunk_size: int, max_chunks: Option
                     pred_str = op.get("predicate", "lambda x: True")
                     pred = eval(pred_str)
                     lazy_col = lazy_col.filter(pred)
+                    has_filter = True
         
         # Apply chunking
         chunked = lazy_col.batch(chunk_size)
@@ -421,18 +427,26 @@ def process_chunking(source_data: List[Any], chunk_size: int, max_chunks: Option
         tracemalloc.start()
         gc.collect()
         
-        chunks = chunked.to_list()
+        # Convert tuples to lists for JSON serialization. Without a filter the
+        # chunk count is known up front, so the output is allocated once and
+        # filled by index instead of growing append by append.
+        if not has_filter and chunk_size > 0 and hasattr(source_data, "__len__"):
+            n_chunks = -(-len(source_data) // chunk_size)
+            if max_chunks:
+                n_chunks = max(0, min(n_chunks, max_chunks))
+            chunks_as_lists = [None] * n_chunks
+            for i, chunk in enumerate(chunked):
+                chunks_as_lists[i] = list(chunk)
+            total_items = min(len(source_data), n_chunks * chunk_size)
+        else:
+            chunks_as_lists = [list(chunk) for chunk in chunked]
+            total_items = sum(len(chunk) for chunk in chunks_as_lists)
         
         current, peak = tracemalloc.get_traced_memory()
         memory_mb = peak / 1024 / 1024
         tracemalloc.stop()
         
-        end_time = time.perf_counter()
-        processing_time_ms = (end_time - start_time) * 1000
-        
-        # Convert tuples to lists for JSON serialization
-        chunks_as_lists = [list(chunk) for chunk in chunks]
-        total_items = sum(len(chunk) for chunk in chunks_as_lists)
+        processing_time_ms = (time.perf_counter_ns() - t0) / 1_000_000
         
         return {
             "chunks": chunks_as_lists,
@@ -451,8 +465,7 @@ def process_chunking(source_data: List[Any], chunk_size: int, max_chunks: Option
         }
         
     except Exception as e:
-        end_time = time.perf_counter()
-        processing_time_ms = (end_time - start_time) * 1000
+        processing_time_ms = (time.perf_counter_ns() - t0) / 1_000_000
         
         return {
             "error": str(e),
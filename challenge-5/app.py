@@ -1,30 +1,136 @@
 """Distributed task scheduler API (submit, monitor, metrics, cleanup)."""
 
-import datetime
-import uuid
-from typing import Any, Dict
+import asyncio
+import base64
+import os
+import sys
+import time
+from typing import Any, Dict, Optional, Tuple
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import orjson
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 
 from utils import (
     TaskScheduler,
-    save_task_to_database, 
+    now_iso,
+    save_tasks_to_database,
     get_task_status,
-    cleanup_completed_tasks, 
-    get_system_metrics
+    cleanup_completed_tasks,
+    close_database_async
 )
 
 from models import (
     TaskSubmissionRequest, 
     TaskSubmissionResponse, 
     TaskStatusResponse,
+    TaskResult,
     WorkerStatusResponse,
     SystemMetricsResponse,
     TaskStatus
 )
 
-scheduler = None
+# orjson options for every JSON body the app encodes (datetime, numpy and
+# dataclass values inside result data are handled natively)
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+class AppJSONResponse(ORJSONResponse):
+    """ORJSONResponse encoding with the app-wide ORJSON_OPTIONS."""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+# Created and started by lifespan; handlers assume it is present
+scheduler: Optional[TaskScheduler] = None
+
+# task_id -> (status version, encoded TaskStatusResponse) for repeated polls
+_STATUS_CACHE: Dict[str, Tuple[int, bytes]] = {}
+_STATUS_CACHE_MAX = 10_000
+
+# Largest number of submitted tasks persisted in one transaction
+SAVE_BATCH_MAX = 256
+
+async def get_scheduler() -> TaskScheduler:
+    """Dependency: the lifespan-managed scheduler (async so it is not run in the threadpool)."""
+    return scheduler
+
+def new_task_id() -> str:
+    """Return a 22-char URL-safe id from 128 random bits."""
+    return base64.urlsafe_b64encode(os.urandom(16)).rstrip(b'=').decode('ascii')
+
+async def _batch_writer(save_queue: asyncio.Queue) -> None:
+    """Persist queued task rows, coalescing whatever is waiting into one batch.
+
+    A Future in the queue is a flush marker, resolved once the rows queued
+    before it are written; None stops the writer after the rows ahead of it.
+    """
+    while True:
+        batch = [await save_queue.get()]
+        while len(batch) < SAVE_BATCH_MAX:
+            try:
+                batch.append(save_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        rows = [item for item in batch if isinstance(item, dict)]
+        if rows:
+            await save_tasks_to_database(rows)
+        for item in batch:
+            if isinstance(item, asyncio.Future) and not item.done():
+                item.set_result(None)
+        if any(item is None for item in batch):
+            return
+
+async def _flush_saves() -> None:
+    """Wait until every task row queued so far is in the database."""
+    if app.state.save_writer.done():
+        return
+    flushed = asyncio.get_running_loop().create_future()
+    app.state.save_queue.put_nowait(flushed)
+    await flushed
+
+# TaskStatusResponse fields that vary between polls of a running task; every
+# other field is fixed for that shape (status "running", the rest defaults)
+_RUNNING_VALUES = ('task_id', 'progress', 'worker_id', 'started_at', 'retry_count')
+
+def _running_parts() -> Tuple[Tuple[str, ...], Tuple[bytes, ...]]:
+    """Split a running TaskStatusResponse body around its varying values.
+
+    Derived from TaskStatusResponse.model_fields so the fast path keeps the
+    model's field order and defaults when the model changes.
+    """
+    names, parts, chunk = [], [], b'{'
+    for i, (name, field) in enumerate(TaskStatusResponse.model_fields.items()):
+        chunk += (b',' if i else b'') + orjson.dumps(name) + b':'
+        if name in _RUNNING_VALUES:
+            names.append(name)
+            parts.append(chunk)
+            chunk = b''
+        elif name == 'status':
+            chunk += orjson.dumps(TaskStatus.RUNNING.value)
+        elif field.is_required():
+            raise TypeError(f"TaskStatusResponse.{name} has no value for running tasks")
+        else:
+            chunk += orjson.dumps(field.get_default(call_default_factory=True))
+    parts.append(chunk + b'}')
+    return tuple(names), tuple(parts)
+
+_RUNNING_NAMES, _RUNNING_PARTS = _running_parts()
+
+def _encode_running_status(task_id: str, live_status: Dict[str, Any]) -> bytes:
+    """Encode the common still-running status without building a model."""
+    values = {
+        'task_id': orjson.dumps(task_id),
+        'progress': b'%d' % live_status.get('progress', 0),
+        'worker_id': orjson.dumps(live_status.get('worker_id')),
+        'started_at': orjson.dumps(live_status.get('started_at')),
+        'retry_count': b'%d' % live_status.get('retry_count', 0),
+    }
+    chunks = [_RUNNING_PARTS[0]]
+    for name, part in zip(_RUNNING_NAMES, _RUNNING_PARTS[1:]):
+        chunks += (values[name], part)
+    return b''.join(chunks)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -33,99 +139,144 @@ async def lifespan(app: FastAPI):
     
     # Startup
     print("🚀 Starting Distributed Task Scheduler...")
+    # Hot-path models are deferred; build them now so the first poll doesn't pay for it
+    TaskStatusResponse.model_rebuild(force=True)
+    TaskResult.model_rebuild(force=True)
     scheduler = TaskScheduler(max_workers=4, queue_size=100)
     await scheduler.start()
+    app.state.save_queue = asyncio.Queue()
+    app.state.save_writer = asyncio.create_task(_batch_writer(app.state.save_queue))
     print("✅ Task Scheduler initialized with worker pool")
     
     yield
     
     # Shutdown
     print("🛑 Shutting down Task Scheduler...")
+    # Stop the writer behind everything already queued; cancelling it could
+    # drop a batch it has taken off the queue but not yet written
+    app.state.save_queue.put_nowait(None)
+    await app.state.save_writer
     await scheduler.shutdown()
+    await close_database_async()
     print("✅ Cleanup completed")
 
 app = FastAPI(
     title="Distributed Task Scheduler",
     description="A high-performance task scheduling system with distributed workers",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=AppJSONResponse
 )
 
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception) -> AppJSONResponse:
+    """Turn any unhandled handler error into one 500 response (HTTPExceptions pass through)."""
+    return AppJSONResponse({"detail": f"{request.url.path} failed: {exc}"}, status_code=500)
+
+_default_openapi = app.openapi
+
+def _openapi() -> Dict[str, Any]:
+    """OpenAPI schema plus the /tasks/submit body, which is validated by hand.
+
+    Generated on the first docs request rather than at import, so the
+    deferred TaskSubmissionRequest schema is not built just to load the app.
+    """
+    if app.openapi_schema is None:
+        schema = _default_openapi()
+        schema["paths"]["/tasks/submit"]["post"]["requestBody"] = {
+            "required": True,
+            "content": {"application/json": {"schema": TaskSubmissionRequest.model_json_schema()}}
+        }
+    return app.openapi_schema
+
+app.openapi = _openapi
+
 @app.post("/tasks/submit", response_model=TaskSubmissionResponse)
 async def submit_task(
-    request: TaskSubmissionRequest,
-    background_tasks: BackgroundTasks
+    raw_request: Request,
+    sched: TaskScheduler = Depends(get_scheduler)
 ) -> TaskSubmissionResponse:
     """Submit task to scheduler (queued by priority)."""
-    start_time = datetime.datetime.now()
-    
-    # Initialize scheduler if not already done (for testing)
-    global scheduler
-    if scheduler is None:
-        scheduler = TaskScheduler(max_workers=4, queue_size=100)
-        await scheduler.start()
+    start_ns = time.monotonic_ns()
     
+    # Validate straight from the body bytes instead of FastAPI's parse-then-validate
     try:
-        # Generate unique task ID
-        task_id = str(uuid.uuid4())
-        
-        # Create task with metadata
-        task = {
-            'id': task_id,
-            'name': request.task_name,
-            'payload': request.payload,
-            'priority': request.priority,
-            'max_retries': request.max_retries,
-            'timeout': request.timeout,
-            'created_at': start_time.isoformat(),
-            'status': TaskStatus.PENDING
-        }
-        
-        # Submit to scheduler
-        success = await scheduler.submit_task(task)
-        
-        if not success:
-            raise HTTPException(
-                status_code=503, 
-                detail="Task queue is full. Please try again later."
-            )
-        
-        # Save to database asynchronously
-        background_tasks.add_task(save_task_to_database, task)
-        
-        processing_time = (datetime.datetime.now() - start_time).total_seconds() * 1000
-        
-        return TaskSubmissionResponse(
-            task_id=task_id,
-            status=TaskStatus.PENDING,
-            message="Task submitted successfully",
-            queue_position=await scheduler.get_queue_position(task_id),
-            estimated_start_time=await scheduler.estimate_start_time(task_id),
-            processing_time_ms=processing_time
+        request = TaskSubmissionRequest.model_validate_json(await raw_request.body())
+    except ValidationError as e:
+        # Same shape as FastAPI's own body errors: every location starts at "body"
+        raise RequestValidationError(
+            [{**err, 'loc': ('body', *err['loc'])} for err in e.errors(include_url=False)]
         )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to submit task: {str(e)}")
+    
+    # Generate unique task ID
+    task_id = new_task_id()
+    
+    # Create task with metadata
+    task = {
+        'id': task_id,
+        'name': request.task_name,
+        'payload': request.payload,
+        # Interned, so it is the same object as the TaskPriority value it names
+        'priority': sys.intern(request.priority),
+        'max_retries': request.max_retries,
+        'timeout': request.timeout,
+        'created_at': now_iso(),
+        'status': TaskStatus.PENDING
+    }
+    
+    # Submit to scheduler (queue position and ETA come back with it)
+    success, queue_position, estimated_start_time = await sched.submit_and_describe(task)
+    
+    if not success:
+        raise HTTPException(
+            status_code=503, 
+            detail="Task queue is full. Please try again later."
+        )
+    
+    # Save to database asynchronously (batched by the lifespan writer)
+    app.state.save_queue.put_nowait(task)
+    
+    processing_time = (time.monotonic_ns() - start_ns) / 1_000_000
+    
+    # Values are produced here, not by the client, so hand the
+    # TaskSubmissionResponse fields straight to orjson (no model round-trip)
+    return AppJSONResponse({
+        'task_id': task_id,
+        'status': TaskStatus.PENDING.value,
+        'message': "Task submitted successfully",
+        'queue_position': queue_position,
+        'estimated_start_time': estimated_start_time,
+        'processing_time_ms': processing_time
+    })
 
 @app.get("/tasks/{task_id}/status", response_model=TaskStatusResponse)
-async def get_task_status_endpoint(task_id: str) -> TaskStatusResponse:
+async def get_task_status_endpoint(
+    task_id: str,
+    sched: TaskScheduler = Depends(get_scheduler)
+) -> TaskStatusResponse:
     """Return live or persisted status for task_id."""
-    try:
-        # Initialize scheduler if not already done (for testing)
-        global scheduler
-        if scheduler is None:
-            scheduler = TaskScheduler(max_workers=4, queue_size=100)
-            await scheduler.start()
-        
-        # Check scheduler first for live status
-        live_status = await scheduler.get_task_status(task_id)
-        
-        if live_status:
-            return TaskStatusResponse(
+    # Unchanged tasks are served from the encoded response of the last poll
+    version = await sched.get_task_version(task_id)
+    if version is not None:
+        cached = _STATUS_CACHE.get(task_id)
+        if cached is not None and cached[0] == version:
+            return Response(cached[1], media_type="application/json")
+    
+    # Check scheduler first for live status
+    live_status = await sched.get_task_status(task_id)
+    
+    if live_status:
+        if live_status['status'] == 'running' and not live_status.get('result'):
+            # Dominant polling shape: fill the precomputed running template
+            body = _encode_running_status(task_id, live_status)
+        else:
+            # Live status comes from the scheduler itself, so skip validation
+            result = live_status.get('result')
+            response = TaskStatusResponse.model_construct(
                 task_id=task_id,
                 status=live_status['status'],
                 progress=live_status.get('progress', 0),
-                result=live_status.get('result'),
+                result=TaskResult.model_construct(**result) if result else None,
                 error_message=live_status.get('error'),
                 worker_id=live_status.get('worker_id'),
                 started_at=live_status.get('started_at'),
@@ -133,99 +284,58 @@ async def get_task_status_endpoint(task_id: str) -> TaskStatusResponse:
                 processing_time_ms=live_status.get('processing_time_ms'),
                 retry_count=live_status.get('retry_count', 0)
             )
-        
-        # Fall back to database lookup
-        db_status = await get_task_status(task_id)
-        if not db_status:
-            raise HTTPException(status_code=404, detail="Task not found")
-        
-        return TaskStatusResponse(**db_status)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get task status: {str(e)}")
+            # Python-mode dump: orjson encodes nested values natively
+            body = orjson.dumps(response.model_dump(), option=ORJSON_OPTIONS)
+        if version is not None:
+            if len(_STATUS_CACHE) >= _STATUS_CACHE_MAX:
+                _STATUS_CACHE.clear()
+            _STATUS_CACHE[task_id] = (version, body)
+        return Response(body, media_type="application/json")
+    
+    # Fall back to database lookup; submissions are persisted asynchronously,
+    # so let queued rows land first or a just-submitted task could 404
+    await _flush_saves()
+    db_status = await get_task_status(task_id)
+    if not db_status:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    return TaskStatusResponse(**db_status)
 
 @app.get("/tasks/{task_id}/cancel")
-async def cancel_task(task_id: str) -> Dict[str, Any]:
+async def cancel_task(
+    task_id: str,
+    sched: TaskScheduler = Depends(get_scheduler)
+) -> Dict[str, Any]:
     """Attempt to cancel pending/running task."""
-    try:
-        # Initialize scheduler if not already done (for testing)
-        global scheduler
-        if scheduler is None:
-            scheduler = TaskScheduler(max_workers=4, queue_size=100)
-            await scheduler.start()
-        
-        success = await scheduler.cancel_task(task_id)
-        
-        if success:
-            return {
-                "task_id": task_id,
-                "status": "cancelled",
-                "message": "Task cancelled successfully"
-            }
-        else:
-            raise HTTPException(
-                status_code=400, 
-                detail="Task cannot be cancelled (not found or already completed)"
-            )
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to cancel task: {str(e)}")
+    success = await sched.cancel_task(task_id)
+    
+    if success:
+        return {
+            "task_id": task_id,
+            "status": "cancelled",
+            "message": "Task cancelled successfully"
+        }
+    else:
+        raise HTTPException(
+            status_code=400, 
+            detail="Task cannot be cancelled (not found or already completed)"
+        )
 
 @app.get("/workers/status", response_model=WorkerStatusResponse)
-async def get_workers_status() -> WorkerStatusResponse:
+async def get_workers_status(sched: TaskScheduler = Depends(get_scheduler)) -> WorkerStatusResponse:
     """Return worker pool utilization + counts."""
-    try:
-        # Initialize scheduler if not already done (for testing)
-        global scheduler
-        if scheduler is None:
-            scheduler = TaskScheduler(max_workers=4, queue_size=100)
-            await scheduler.start()
-        
-        worker_stats = await scheduler.get_worker_stats()
-        
-        return WorkerStatusResponse(
-            total_workers=worker_stats['total_workers'],
-            active_workers=worker_stats['active_workers'],
-            idle_workers=worker_stats['idle_workers'],
-            workers=worker_stats['workers'],
-            queue_size=worker_stats['queue_size'],
-            completed_tasks=worker_stats['completed_tasks'],
-            failed_tasks=worker_stats['failed_tasks']
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get worker status: {str(e)}")
+    worker_stats = await sched.get_worker_stats()
+    
+    # Stats come from the scheduler itself, so encode them without building models
+    return Response(orjson.dumps(worker_stats, option=ORJSON_OPTIONS), media_type="application/json")
 
 @app.get("/system/metrics", response_model=SystemMetricsResponse)
-async def get_system_metrics_endpoint() -> SystemMetricsResponse:
+async def get_system_metrics_endpoint(sched: TaskScheduler = Depends(get_scheduler)) -> SystemMetricsResponse:
     """Return system + scheduler metrics snapshot."""
-    try:
-        # Initialize scheduler if not already done (for testing)
-        global scheduler
-        if scheduler is None:
-            scheduler = TaskScheduler(max_workers=4, queue_size=100)
-            await scheduler.start()
-        
-        metrics = await get_system_metrics()
-        scheduler_stats = await scheduler.get_scheduler_stats()
-        
-        return SystemMetricsResponse(
-            uptime_seconds=metrics['uptime_seconds'],
-            cpu_usage_percent=metrics['cpu_usage_percent'],
-            memory_usage_mb=metrics['memory_usage_mb'],
-            total_tasks_processed=scheduler_stats['total_processed'],
-            tasks_per_second=scheduler_stats['throughput'],
-            average_task_time_ms=scheduler_stats['avg_processing_time'],
-            worker_utilization=scheduler_stats['worker_utilization'],
-            queue_utilization=scheduler_stats['queue_utilization']
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get system metrics: {str(e)}")
+    # One call gathers host and scheduler numbers already keyed for the response
+    metrics = await sched.get_combined_metrics()
+    
+    return AppJSONResponse(metrics)
 
 @app.post("/system/cleanup")
 async def cleanup_system(
@@ -233,43 +343,43 @@ async def cleanup_system(
     older_than_hours: int = 24
 ) -> Dict[str, Any]:
     """Enqueue background cleanup of old completed tasks."""
-    try:
-        background_tasks.add_task(cleanup_completed_tasks, older_than_hours)
-        
-        return {
-            "message": f"Cleanup initiated for tasks older than {older_than_hours} hours",
-            "status": "started"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to start cleanup: {str(e)}")
+    background_tasks.add_task(cleanup_completed_tasks, older_than_hours)
+    
+    return {
+        "message": f"Cleanup initiated for tasks older than {older_than_hours} hours",
+        "status": "started"
+    }
 
 @app.get("/health")
-async def health_check() -> Dict[str, Any]:
+async def health_check(sched: TaskScheduler = Depends(get_scheduler)) -> Dict[str, Any]:
     """Lightweight scheduler health probe."""
     try:
-        # Initialize scheduler if not already done (for testing)
-        global scheduler
-        if scheduler is None:
-            scheduler = TaskScheduler(max_workers=4, queue_size=100)
-            await scheduler.start()
-        
-        is_healthy = await scheduler.health_check()
+        is_healthy = await sched.health_check()
         
         return {
             "status": "healthy" if is_healthy else "unhealthy",
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "scheduler_running": is_healthy,
-            "worker_pool_active": await scheduler.worker_pool_active()
+            "worker_pool_active": await sched.worker_pool_active()
         }
         
     except Exception as e:
         return {
             "status": "unhealthy",
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "error": str(e)
         }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One worker process: the scheduler and its queues live in this process.
+    # "auto" picks uvloop and httptools when installed (see requirements.txt).
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        log_level="warning",
+        access_log=False
+    )
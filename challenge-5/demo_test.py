@@ -105,8 +105,12 @@ def test_api_functionality():
     """Test the FastAPI endpoints"""
     print_banner("API FUNCTIONALITY TEST")
     
-    client = TestClient(app)
-    
+    # Entering the client runs the app lifespan, which starts the scheduler
+    with TestClient(app) as client:
+        return _run_api_checks(client)
+
+def _run_api_checks(client):
+    """Exercise the API endpoints against a started app"""
     print_section("Health Check")
     response = client.get("/health")
     if response.status_code == 200:
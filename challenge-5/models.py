@@ -1,10 +1,22 @@
 """Models for distributed task scheduler (tasks, workers, metrics)."""
 
-from typing import Any, Dict, List, Optional, Union
-from pydantic import BaseModel, Field, field_validator
-from datetime import datetime
-from enum import Enum
-import json
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from enum import Enum, IntEnum
+import sys
+
+
+# Shared model config: core schemas are built on first use, not at import
+BASE_CONFIG = ConfigDict(defer_build=True)
+
+# Response/result models: one instance per response, built, serialized and
+# dropped; frozen so nothing can refill an instance for another request
+RESPONSE_CONFIG = ConfigDict(
+    defer_build=True,
+    frozen=True,
+    extra='ignore',
+    revalidate_instances='never'
+)
 
 
 class TaskPriority(str, Enum):
@@ -15,6 +27,19 @@ class TaskPriority(str, Enum):
     URGENT = "urgent"
 
 
+class PriorityLevel(IntEnum):
+    """Internal priority codes (higher runs first)."""
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+    URGENT = 3
+
+
+# API priority string -> internal code, resolved once at submission. Keys are
+# interned so lookups with interned request strings match by identity.
+PRIORITY_LEVELS = {sys.intern(p.value): PriorityLevel[p.name] for p in TaskPriority}
+
+
 class TaskStatus(str, Enum):
     """Execution lifecycle states."""
     PENDING = "pending"
@@ -25,8 +50,15 @@ class TaskStatus(str, Enum):
     RETRYING = "retrying"
 
 
+# Literal forms of the enum values for validated model fields; pydantic-core
+# matches these against plain strings instead of building Enum members
+PriorityName = Literal[tuple(p.value for p in TaskPriority)]
+StatusName = Literal[tuple(s.value for s in TaskStatus)]
+
+
 class TaskSubmissionRequest(BaseModel):
     """Submit task request payload."""
+    model_config = BASE_CONFIG
     task_name: str = Field(
         ..., 
         description="Name/type of the task to execute",
@@ -35,10 +67,10 @@ class TaskSubmissionRequest(BaseModel):
     )
     payload: Dict[str, Any] = Field(
         ...,
-        description="Task payload data"
+        description="Task payload data (serializability is checked by the worker)"
     )
-    priority: TaskPriority = Field(
-        default=TaskPriority.NORMAL,
+    priority: PriorityName = Field(
+        default=TaskPriority.NORMAL.value,
         description="Task priority level"
     )
     max_retries: int = Field(
@@ -53,22 +85,13 @@ class TaskSubmissionRequest(BaseModel):
         le=3600,
         description="Task timeout in seconds"
     )
-    
-    @field_validator('payload')
-    @classmethod
-    def validate_payload(cls, v):
-        """Ensure payload JSON serializable."""
-        try:
-            json.dumps(v)
-            return v
-        except (TypeError, ValueError) as e:
-            raise ValueError(f"Payload must be JSON serializable: {e}")
 
 
 class TaskSubmissionResponse(BaseModel):
     """Submission acknowledgment."""
+    model_config = RESPONSE_CONFIG
     task_id: str = Field(..., description="Unique task identifier")
-    status: TaskStatus = Field(..., description="Current task status")
+    status: StatusName = Field(..., description="Current task status")
     message: str = Field(..., description="Status message")
     queue_position: int = Field(..., description="Position in task queue")
     estimated_start_time: Optional[str] = Field(None, description="Estimated start time")
@@ -77,6 +100,7 @@ class TaskSubmissionResponse(BaseModel):
 
 class TaskResult(BaseModel):
     """Result wrapper for completed task."""
+    model_config = RESPONSE_CONFIG
     success: bool = Field(..., description="Whether task completed successfully")
     result_data: Optional[Dict[str, Any]] = Field(None, description="Task result data")
     error_message: Optional[str] = Field(None, description="Error message if failed")
@@ -85,8 +109,9 @@ class TaskResult(BaseModel):
 
 class TaskStatusResponse(BaseModel):
     """Status query response."""
+    model_config = RESPONSE_CONFIG
     task_id: str = Field(..., description="Task identifier")
-    status: TaskStatus = Field(..., description="Current task status")
+    status: StatusName = Field(..., description="Current task status")
     progress: int = Field(default=0, ge=0, le=100, description="Task progress percentage")
     result: Optional[TaskResult] = Field(None, description="Task result if completed")
     error_message: Optional[str] = Field(None, description="Error message if failed")
@@ -99,6 +124,7 @@ class TaskStatusResponse(BaseModel):
 
 class WorkerInfo(BaseModel):
     """Worker runtime stats."""
+    model_config = RESPONSE_CONFIG
     worker_id: str = Field(..., description="Unique worker identifier")
     status: str = Field(..., description="Worker status (idle, busy, error)")
     current_task: Optional[str] = Field(None, description="Currently processing task ID")
@@ -112,6 +138,7 @@ class WorkerInfo(BaseModel):
 
 class WorkerStatusResponse(BaseModel):
     """Aggregate worker pool stats."""
+    model_config = RESPONSE_CONFIG
     total_workers: int = Field(..., description="Total number of workers")
     active_workers: int = Field(..., description="Number of active workers")
     idle_workers: int = Field(..., description="Number of idle workers")
@@ -123,6 +150,7 @@ class WorkerStatusResponse(BaseModel):
 
 class SystemMetricsResponse(BaseModel):
     """System + scheduler metrics snapshot."""
+    model_config = RESPONSE_CONFIG
     uptime_seconds: float = Field(..., description="System uptime in seconds")
     cpu_usage_percent: float = Field(..., description="System CPU usage percentage")
     memory_usage_mb: float = Field(..., description="System memory usage in MB")
@@ -135,6 +163,7 @@ class SystemMetricsResponse(BaseModel):
 
 class SchedulerStats(BaseModel):
     """Scheduler performance counters."""
+    model_config = RESPONSE_CONFIG
     total_submitted: int = Field(default=0, description="Total tasks submitted")
     total_processed: int = Field(default=0, description="Total tasks processed")
     total_failed: int = Field(default=0, description="Total tasks failed")
@@ -147,6 +176,7 @@ class SchedulerStats(BaseModel):
 
 class ErrorResponse(BaseModel):
     """Error envelope."""
+    model_config = RESPONSE_CONFIG
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Detailed error information")
     timestamp: str = Field(..., description="Error timestamp")
@@ -155,6 +185,7 @@ class ErrorResponse(BaseModel):
 
 class StatusResponse(BaseModel):
     """Generic status payload."""
+    model_config = RESPONSE_CONFIG
     status: str = Field(..., description="Status message")
     timestamp: str = Field(..., description="Response timestamp")
     data: Optional[Dict[str, Any]] = Field(None, description="Additional data")
@@ -1,53 +1,109 @@
 import pytest
-import asyncio
-import tempfile
+import pytest_asyncio
 import os
+import sqlite3
+import time
+import uuid
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from fastapi.testclient import TestClient
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app import app
-from utils import TaskScheduler
+from utils import TASK_HANDLERS, TaskScheduler, close_database
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--full-scaling", action="store_true", default=False,
+        help="run test_worker_scaling_efficiency with 1, 2, 4 and 8 workers instead of 1 and 4",
+    )
+
+
+# Fields shared by every scheduler task the tests submit
+TASK_DEFAULTS = {
+    "priority": "normal",
+    "max_retries": 1,
+    "timeout": 30,
+    "status": "pending",
+}
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+def make_task():
+    # Scheduler task dict: TASK_DEFAULTS plus the caller's fields
+    def build(**fields):
+        return dict(TASK_DEFAULTS, **fields)
+    return build
+
+
+def _hold_worker(payload):
+    time.sleep(payload["duration"])
+    return {"slept_for": payload["duration"]}
 
 
 @pytest.fixture
+def worker_bound_task(monkeypatch):
+    # Test-only task type that holds its worker thread for payload["duration"],
+    # so run time depends on max_workers; yields the registered task name
+    monkeypatch.setitem(TASK_HANDLERS, "hold_worker", _hold_worker)
+    return "hold_worker"
+
+
+@pytest.fixture(scope="session")
 def client():
     with TestClient(app) as test_client:
         yield test_client
 
 
-@pytest.fixture
-async def test_scheduler():
-    scheduler = TaskScheduler(max_workers=2, queue_size=10)
-    await scheduler.start()
-    yield scheduler
-    await scheduler.shutdown()
+@pytest.fixture(scope="session")
+def process_pool():
+    # One process pool for the run; schedulers borrow it instead of spawning their own
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        yield pool
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def scheduler_pool():
+    # Started schedulers keyed by (max_workers, queue_size); reset on reuse
+    schedulers = {}
+
+    async def get(max_workers, queue_size):
+        scheduler = schedulers.get((max_workers, queue_size))
+        if scheduler is None:
+            scheduler = TaskScheduler(max_workers=max_workers, queue_size=queue_size)
+            await scheduler.start()
+            schedulers[(max_workers, queue_size)] = scheduler
+        else:
+            await scheduler.reset()
+        return scheduler
+
+    yield get
+    for scheduler in schedulers.values():
+        await scheduler.shutdown()
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def test_scheduler(scheduler_pool):
+    yield await scheduler_pool(2, 10)
 
 
 @pytest.fixture
 def temp_db():
-    temp_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
-    temp_file.close()
+    # Shared-cache in-memory database; it lives as long as one connection is open
+    db_uri = f'file:test_db_{uuid.uuid4().hex}?mode=memory&cache=shared'
+    keeper = sqlite3.connect(db_uri, uri=True)
     original_path = os.environ.get('DB_PATH')
-    os.environ['DB_PATH'] = temp_file.name
-    yield temp_file.name
+    os.environ['DB_PATH'] = db_uri
+    yield db_uri
     if original_path:
         os.environ['DB_PATH'] = original_path
     else:
         os.environ.pop('DB_PATH', None)
-    try:
-        os.unlink(temp_file.name)
-    except OSError:
-        pass
+    close_database()
+    keeper.close()
 
 
 @pytest.fixture
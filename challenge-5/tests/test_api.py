@@ -0,0 +1,23 @@
+"""
+API tests for the task submission endpoint
+"""
+
+
+def test_submit_task(client, sample_compute_task):
+    """Test that a valid submission is accepted and queued"""
+    response = client.post("/tasks/submit", json=sample_compute_task)
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "pending"
+    assert body["task_id"]
+
+
+def test_submit_validation_error_loc(client):
+    """Test that body validation errors keep FastAPI's ["body", field] locations"""
+    response = client.post("/tasks/submit", json={"task_name": "compute"})
+    
+    assert response.status_code == 422
+    errors = response.json()["detail"]
+    assert [error["loc"] for error in errors] == [["body", "payload"]]
+    assert errors[0]["type"] == "missing"
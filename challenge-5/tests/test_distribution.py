@@ -8,144 +8,116 @@ import asyncio
 import time
 import os
 from concurrent.futures import as_completed
-from utils import TaskScheduler, TaskProcessor
+from utils import PROCESS_DATA_MAX_ITEMS, Task, TaskProcessor, WorkerPool
+from models import PriorityLevel, TaskStatus
 
 
 class TestTaskDistribution:
     """Test task distribution across workers"""
     
-    @pytest.mark.asyncio
-    async def test_multiple_workers_active(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_multiple_workers_active(self, scheduler_pool):
         """Test that multiple workers can process tasks simultaneously"""
-        scheduler = TaskScheduler(max_workers=4, queue_size=20)
-        await scheduler.start()
+        scheduler = await scheduler_pool(4, 20)
         
-        try:
-            # Submit multiple long-running tasks
-            tasks = []
-            for i in range(8):  # More tasks than workers
-                task_data = {
-                    'id': f'concurrent-task-{i}',
-                    'name': 'io_operation',
-                    'payload': {'duration': 1.0},  # 1 second each
-                    'priority': 'normal',
-                    'max_retries': 1,
-                    'timeout': 30,
-                    'created_at': time.time(),
-                    'status': 'pending'
-                }
-                success = await scheduler.submit_task(task_data)
-                assert success, f"Failed to submit task {i}"
-                tasks.append(task_data['id'])
-            
-            # Wait a bit for tasks to start
-            await asyncio.sleep(0.5)
-            
-            # Check that multiple workers are active
-            worker_stats = await scheduler.get_worker_stats()
-            assert worker_stats['active_workers'] > 1, "Multiple workers should be active simultaneously"
-            
-            # Wait for all tasks to complete
-            await asyncio.sleep(3)
-            
-            # Verify all tasks completed
-            completed_count = 0
-            for task_id in tasks:
-                status = await scheduler.get_task_status(task_id)
-                if status and status['status'] == 'completed':
-                    completed_count += 1
-            
-            assert completed_count == len(tasks), f"Expected {len(tasks)} completed, got {completed_count}"
-            
-        finally:
-            await scheduler.shutdown()
+        # Submit multiple long-running tasks
+        tasks = []
+        for i in range(8):  # More tasks than workers
+            task_data = {
+                'id': f'concurrent-task-{i}',
+                'name': 'io_operation',
+                'payload': {'duration': 1.0},  # 1 second each
+                'priority': 'normal',
+                'max_retries': 1,
+                'timeout': 30,
+                'created_at': time.time(),
+                'status': 'pending'
+            }
+            success = await scheduler.submit_task(task_data)
+            assert success, f"Failed to submit task {i}"
+            tasks.append(task_data['id'])
+        
+        # Wait a bit for tasks to start
+        await asyncio.sleep(0.5)
+        
+        # Check that multiple workers are active
+        worker_stats = await scheduler.get_worker_stats()
+        assert worker_stats['active_workers'] > 1, "Multiple workers should be active simultaneously"
+        
+        # Wait for all tasks to complete
+        assert await scheduler.wait_all(tasks, timeout=3)
+        
+        # Verify all tasks completed
+        completed_count = (await scheduler.count_statuses(tasks)).get('completed', 0)
+        
+        assert completed_count == len(tasks), f"Expected {len(tasks)} completed, got {completed_count}"
     
-    @pytest.mark.asyncio 
-    async def test_task_distribution_load_balancing(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_task_distribution_load_balancing(self, scheduler_pool):
         """Test that tasks are distributed evenly across workers"""
-        scheduler = TaskScheduler(max_workers=3, queue_size=15)
-        await scheduler.start()
+        scheduler = await scheduler_pool(3, 15)
         
-        try:
-            # Submit many quick tasks
-            task_count = 12
-            tasks = []
-            
-            for i in range(task_count):
-                task_data = {
-                    'id': f'load-balance-task-{i}',
-                    'name': 'compute',
-                    'payload': {'iterations': 1000},  # Quick tasks
-                    'priority': 'normal',
-                    'max_retries': 1,
-                    'timeout': 30,
-                    'created_at': time.time(),
-                    'status': 'pending'
-                }
-                success = await scheduler.submit_task(task_data)
-                assert success
-                tasks.append(task_data['id'])
-            
-            # Wait for all to complete
-            await asyncio.sleep(2)
-            
-            # Verify all completed
-            completed = 0
-            for task_id in tasks:
-                status = await scheduler.get_task_status(task_id)
-                if status and status['status'] == 'completed':
-                    completed += 1
-            
-            assert completed == task_count, f"Expected {task_count} completed, got {completed}"
-            
-            # Check final stats
-            final_stats = await scheduler.get_worker_stats()
-            assert final_stats['completed_tasks'] >= task_count
-            
-        finally:
-            await scheduler.shutdown()
+        # Submit many quick tasks
+        task_count = 12
+        tasks = []
+        
+        for i in range(task_count):
+            task_data = {
+                'id': f'load-balance-task-{i}',
+                'name': 'compute',
+                'payload': {'iterations': 1000},  # Quick tasks
+                'priority': 'normal',
+                'max_retries': 1,
+                'timeout': 30,
+                'created_at': time.time(),
+                'status': 'pending'
+            }
+            success = await scheduler.submit_task(task_data)
+            assert success
+            tasks.append(task_data['id'])
+        
+        # Wait for all to complete
+        assert await scheduler.wait_all(tasks, timeout=2)
+        
+        # Verify all completed
+        completed = (await scheduler.count_statuses(tasks)).get('completed', 0)
+        
+        assert completed == task_count, f"Expected {task_count} completed, got {completed}"
+        
+        # Check final stats
+        final_stats = await scheduler.get_worker_stats()
+        assert final_stats['completed_tasks'] >= task_count
     
-    @pytest.mark.asyncio
-    async def test_worker_process_isolation(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_worker_process_isolation(self, scheduler_pool):
         """Test that workers run in separate processes/threads"""
-        scheduler = TaskScheduler(max_workers=2, queue_size=10)
-        await scheduler.start()
+        scheduler = await scheduler_pool(2, 10)
         
-        try:
-            # Submit tasks that capture worker PID/thread info
-            tasks = []
-            for i in range(4):
-                task_data = {
-                    'id': f'isolation-task-{i}',
-                    'name': 'compute',
-                    'payload': {'iterations': 1000},
-                    'priority': 'normal',
-                    'max_retries': 1,
-                    'timeout': 30,
-                    'created_at': time.time(),
-                    'status': 'pending'
-                }
-                success = await scheduler.submit_task(task_data)
-                assert success
-                tasks.append(task_data['id'])
-            
-            await asyncio.sleep(2)
-            
-            # Check that tasks were processed (indicating workers are functioning)
-            worker_pids = set()
-            completed_tasks = 0
-            
-            for task_id in tasks:
-                status = await scheduler.get_task_status(task_id)
-                if status and status['status'] == 'completed':
-                    completed_tasks += 1
-                    # In a real process pool, we could check different PIDs
-                    # For now, verify the task processing worked
-            
-            assert completed_tasks > 0, "At least some tasks should complete"
-            
-        finally:
-            await scheduler.shutdown()
+        # Submit tasks that capture worker PID/thread info
+        tasks = []
+        for i in range(4):
+            task_data = {
+                'id': f'isolation-task-{i}',
+                'name': 'compute',
+                'payload': {'iterations': 1000},
+                'priority': 'normal',
+                'max_retries': 1,
+                'timeout': 30,
+                'created_at': time.time(),
+                'status': 'pending'
+            }
+            success = await scheduler.submit_task(task_data)
+            assert success
+            tasks.append(task_data['id'])
+        
+        assert await scheduler.wait_all(tasks, timeout=2)
+        
+        # Check that tasks were processed (indicating workers are functioning)
+        # In a real process pool, we could check different PIDs
+        # For now, verify the task processing worked
+        completed_tasks = (await scheduler.count_statuses(tasks)).get('completed', 0)
+        
+        assert completed_tasks > 0, "At least some tasks should complete"
     
     def test_task_processor_isolation(self):
         """Test that TaskProcessor can handle tasks independently"""
@@ -180,93 +152,107 @@ class TestTaskDistribution:
             assert 'task_id' in result
     
     @pytest.mark.asyncio
-    async def test_queue_capacity_and_rejection(self):
-        """Test queue capacity limits and task rejection"""
-        scheduler = TaskScheduler(max_workers=1, queue_size=3)  # Small queue
-        await scheduler.start()
+    async def test_large_data_payload_skips_process_pool(self):
+        """Test that large data_processing payloads run on threads instead of being pickled"""
+        pool = WorkerPool(max_workers=1)
+        await pool.start()
         
         try:
-            # Fill up the queue
-            accepted_tasks = []
-            rejected_count = 0
-            
-            # Try to submit more tasks than queue can handle
-            for i in range(10):
-                task_data = {
-                    'id': f'capacity-task-{i}',
-                    'name': 'io_operation',
-                    'payload': {'duration': 2.0},  # Long running
-                    'priority': 'normal',
-                    'max_retries': 1,
-                    'timeout': 30,
-                    'created_at': time.time(),
-                    'status': 'pending'
-                }
-                
-                success = await scheduler.submit_task(task_data)
-                if success:
-                    accepted_tasks.append(task_data['id'])
-                else:
-                    rejected_count += 1
+            sizes = {'small-data': 10, 'large-data': PROCESS_DATA_MAX_ITEMS + 1}
+            for task_id, size in sizes.items():
+                task = Task(
+                    task_id, 'data_processing', {'data': list(range(size))},
+                    PriorityLevel.NORMAL, 1, 30, time.time(), TaskStatus.PENDING,
+                )
+                await pool.submit_task(task)
             
-            # Should have accepted some but rejected others due to queue limit
-            assert len(accepted_tasks) > 0, "Some tasks should be accepted"
-            assert rejected_count > 0, "Some tasks should be rejected when queue is full"
+            assert pool._task_exec_map['small-data'] == 'process'
+            assert pool._task_exec_map['large-data'] == 'thread'
             
-            # Queue size should not exceed limit
-            stats = await scheduler.get_worker_stats()
-            assert stats['queue_size'] <= 3, "Queue size should not exceed limit"
+            result = pool.active_tasks['large-data'].result(timeout=5)
+            assert result['status'] == 'completed'
+            assert result['result']['result_data']['original_count'] == sizes['large-data']
             
         finally:
-            await scheduler.shutdown()
+            await pool.stop()
     
-    @pytest.mark.asyncio
-    async def test_priority_based_distribution(self):
-        """Test that high priority tasks are processed first"""
-        scheduler = TaskScheduler(max_workers=1, queue_size=10)  # Single worker for clear ordering
-        await scheduler.start()
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_queue_capacity_and_rejection(self, scheduler_pool):
+        """Test queue capacity limits and task rejection"""
+        scheduler = await scheduler_pool(1, 3)  # Small queue
         
-        try:
-            # Submit tasks with different priorities
-            completion_order = []
-            
-            # Low priority task first
-            low_task = {
-                'id': 'low-priority',
-                'name': 'compute',
-                'payload': {'iterations': 100},
-                'priority': 'low',
-                'max_retries': 1,
-                'timeout': 30,
-                'created_at': time.time(),
-                'status': 'pending'
-            }
-            await scheduler.submit_task(low_task)
-            
-            # High priority task second (should be processed first)
-            high_task = {
-                'id': 'high-priority',
-                'name': 'compute', 
-                'payload': {'iterations': 100},
-                'priority': 'high',
+        # Fill up the queue
+        accepted_tasks = []
+        rejected_count = 0
+        
+        # Try to submit more tasks than queue can handle
+        for i in range(10):
+            task_data = {
+                'id': f'capacity-task-{i}',
+                'name': 'io_operation',
+                'payload': {'duration': 2.0},  # Long running
+                'priority': 'normal',
                 'max_retries': 1,
                 'timeout': 30,
                 'created_at': time.time(),
                 'status': 'pending'
             }
-            await scheduler.submit_task(high_task)
             
-            await asyncio.sleep(1)
-            
-            # Check completion status
-            high_status = await scheduler.get_task_status('high-priority')
-            low_status = await scheduler.get_task_status('low-priority')
-            
-            # At least verify both tasks can be processed
-            assert high_status is not None
-            assert low_status is not None
-            
-        finally:
-            await scheduler.shutdown()
-
-
+            success = await scheduler.submit_task(task_data)
+            if success:
+                accepted_tasks.append(task_data['id'])
+            else:
+                rejected_count += 1
+        
+        # Should have accepted some but rejected others due to queue limit
+        assert len(accepted_tasks) > 0, "Some tasks should be accepted"
+        assert rejected_count > 0, "Some tasks should be rejected when queue is full"
+        
+        # Queue size should not exceed limit
+        stats = await scheduler.get_worker_stats()
+        assert stats['queue_size'] <= 3, "Queue size should not exceed limit"
+        sched_stats = await scheduler.get_scheduler_stats()
+        assert sched_stats['total_rejected'] == rejected_count
+    
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_priority_based_distribution(self, scheduler_pool):
+        """Test that high priority tasks are processed first"""
+        scheduler = await scheduler_pool(1, 10)  # Single worker for clear ordering
+        
+        # Submit tasks with different priorities
+        completion_order = []
+        
+        # Low priority task first
+        low_task = {
+            'id': 'low-priority',
+            'name': 'compute',
+            'payload': {'iterations': 100},
+            'priority': 'low',
+            'max_retries': 1,
+            'timeout': 30,
+            'created_at': time.time(),
+            'status': 'pending'
+        }
+        await scheduler.submit_task(low_task)
+        
+        # High priority task second (should be processed first)
+        high_task = {
+            'id': 'high-priority',
+            'name': 'compute', 
+            'payload': {'iterations': 100},
+            'priority': 'high',
+            'max_retries': 1,
+            'timeout': 30,
+            'created_at': time.time(),
+            'status': 'pending'
+        }
+        await scheduler.submit_task(high_task)
+        
+        assert await scheduler.wait_all(['low-priority', 'high-priority'], timeout=1)
+        
+        # Check completion status
+        high_status, low_status = await scheduler.get_task_statuses(['high-priority', 'low-priority'])
+        
+        # At least verify both tasks can be processed
+        assert high_status is not None
+        assert low_status is not None
@@ -3,9 +3,10 @@ Unit tests for the distributed task scheduler
 """
 
 import pytest
-import asyncio
 import time
-from utils import TaskScheduler, TaskProcessor
+from utils import TaskScheduler, TaskProcessor, DispatchHeap
+from utils import close_database_async, save_tasks_to_database
+from utils import get_task_status as get_persisted_status
 
 
 @pytest.mark.asyncio
@@ -28,6 +29,34 @@ async def test_task_processor():
     assert result['result']['result_data']['iterations'] == 1000
 
 
+def test_compute_matches_sum_of_squares():
+    """Test that the closed-form compute result equals the naive sum of squares"""
+    for n in (0, 1, 2, 7, 1000):
+        result = TaskProcessor.process_task({
+            'id': f'sum-{n}',
+            'name': 'compute',
+            'payload': {'iterations': n}
+        })
+        assert result['result']['result_data']['result'] == sum(i * i for i in range(n))
+
+
+def test_payload_with_wide_integers_is_accepted():
+    """Test that integers beyond 64 bits still pass the serializability check"""
+    result = TaskProcessor.process_task({
+        'id': 'wide-int',
+        'name': 'compute',
+        'payload': {'iterations': 10, 'meta': {'seed': 2 ** 70}}
+    })
+    assert result['status'] == 'completed'
+
+    result = TaskProcessor.process_task({
+        'id': 'not-json',
+        'name': 'compute',
+        'payload': {'iterations': 10, 'meta': {'seed': object()}}
+    })
+    assert result['status'] == 'failed'
+
+
 @pytest.mark.asyncio
 async def test_scheduler_basic():
     """Test basic scheduler functionality"""
@@ -51,7 +80,7 @@ async def test_scheduler_basic():
         assert success is True
         
         # Wait for processing
-        await asyncio.sleep(2)
+        assert await scheduler.wait_all(['test-task-1'], timeout=2)
         
         # Check status
         status = await scheduler.get_task_status('test-task-1')
@@ -63,43 +92,20 @@ async def test_scheduler_basic():
 
 
 @pytest.mark.asyncio
-async def test_different_task_types():
+async def test_different_task_types(make_task):
     """Test different types of tasks"""
     scheduler = TaskScheduler(max_workers=2, queue_size=10)
     await scheduler.start()
     
     try:
+        created_at = time.time()
         tasks = [
-            {
-                'id': 'compute-test',
-                'name': 'compute',
-                'payload': {'iterations': 500},
-                'priority': 'normal',
-                'max_retries': 1,
-                'timeout': 30,
-                'created_at': time.time(),
-                'status': 'pending'
-            },
-            {
-                'id': 'io-test',
-                'name': 'io_operation',
-                'payload': {'duration': 0.1},
-                'priority': 'high',
-                'max_retries': 1,
-                'timeout': 30,
-                'created_at': time.time(),
-                'status': 'pending'
-            },
-            {
-                'id': 'data-test',
-                'name': 'data_processing',
-                'payload': {'data': [1, 2, 3]},
-                'priority': 'normal',
-                'max_retries': 1,
-                'timeout': 30,
-                'created_at': time.time(),
-                'status': 'pending'
-            }
+            make_task(id='compute-test', name='compute',
+                      payload={'iterations': 500}, created_at=created_at),
+            make_task(id='io-test', name='io_operation',
+                      payload={'duration': 0.1}, priority='high', created_at=created_at),
+            make_task(id='data-test', name='data_processing',
+                      payload={'data': [1, 2, 3]}, created_at=created_at),
         ]
         
         # Submit all tasks
@@ -108,7 +114,7 @@ async def test_different_task_types():
             assert success is True
         
         # Wait for processing
-        await asyncio.sleep(3)
+        assert await scheduler.wait_all([task['id'] for task in tasks], timeout=3)
         
         # Check all completed
         for task in tasks:
@@ -171,3 +177,189 @@ async def test_scheduler_stats():
         
     finally:
         await scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_bulk_task_statuses():
+    """Test bulk status lookup matches per-task lookups"""
+    scheduler = TaskScheduler(max_workers=2, queue_size=5)
+    await scheduler.start()
+    
+    try:
+        ids = []
+        for i in range(3):
+            task_data = {
+                'id': f'bulk-{i}',
+                'name': 'compute',
+                'payload': {'iterations': 100},
+                'priority': 'normal',
+                'max_retries': 1,
+                'timeout': 30,
+                'created_at': time.time(),
+                'status': 'pending'
+            }
+            assert await scheduler.submit_task(task_data)
+            ids.append(task_data['id'])
+        
+        assert await scheduler.wait_all(ids, timeout=2)
+        
+        statuses = await scheduler.get_task_statuses(ids + ['missing'])
+        assert len(statuses) == 4
+        assert statuses[-1] is None
+        for task_id, status in zip(ids, statuses):
+            assert status == await scheduler.get_task_status(task_id)
+            assert status['status'] == 'completed'
+        
+        assert await scheduler.count_statuses(ids + ['missing']) == {'completed': 3}
+        
+    finally:
+        await scheduler.shutdown()
+
+
+def test_dispatch_heap_capacity_and_order():
+    """Test dispatch heap bounds, priority order and FIFO within a level"""
+    heap = DispatchHeap(3)
+    
+    assert heap.put_nowait('low', 0) is True
+    assert heap.put_nowait('normal-1', 1) is True
+    assert heap.put_nowait('normal-2', 1) is True
+    assert heap.put_nowait('urgent', 3) is False  # bounded by maxsize
+    assert heap.qsize() == 3
+    
+    assert heap.get_nowait() == 'normal-1'
+    assert heap.put_nowait('urgent', 3) is True
+    
+    seen = []
+    while not heap.empty():
+        seen.append(heap.get_nowait())
+    
+    assert seen == ['urgent', 'normal-2', 'low']
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_incomplete_task():
+    """Test that tasks missing required fields are rejected without queueing"""
+    scheduler = TaskScheduler(max_workers=1, queue_size=5)
+    await scheduler.start()
+    
+    try:
+        task_data = {
+            'id': 'no-name',
+            'payload': {},
+            'priority': 'normal',
+            'max_retries': 1,
+            'timeout': 30,
+            'created_at': time.time(),
+        }
+        
+        assert await scheduler.submit_task(task_data) is False
+        assert scheduler.task_queue.qsize() == 0
+        assert (await scheduler.get_scheduler_stats())['total_rejected'] == 1
+        
+    finally:
+        await scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_submit_tasks_bulk(make_task):
+    """Test that bulk submission accepts up to capacity and rejects the tail"""
+    scheduler = TaskScheduler(max_workers=1, queue_size=2)
+    await scheduler.start()
+    
+    try:
+        created_at = time.time()
+        tasks = [
+            make_task(id=f'bulk-{i}', name='compute',
+                      payload={'iterations': 10}, created_at=created_at)
+            for i in range(4)
+        ]
+        
+        assert await scheduler.submit_tasks(tasks) == [True, True, False, False]
+        assert (await scheduler.get_scheduler_stats())['total_rejected'] == 2
+        assert await scheduler.wait_all(['bulk-0', 'bulk-1'], timeout=5.0)
+        
+    finally:
+        await scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_submit_tasks_rejects_unknown_priority(make_task):
+    """Test that a bad priority rejects only its own task in a batch"""
+    scheduler = TaskScheduler(max_workers=1, queue_size=5)
+    await scheduler.start()
+    
+    try:
+        created_at = time.time()
+        accepted = await scheduler.submit_tasks([
+            make_task(id='prio-ok-0', name='compute', payload={'iterations': 10}, created_at=created_at),
+            make_task(id='prio-bad', name='compute', payload={'iterations': 10},
+                      priority='critical', created_at=created_at),
+            make_task(id='prio-ok-1', name='compute', payload={'iterations': 10}, created_at=created_at),
+        ])
+        
+        assert accepted == [True, False, True]
+        assert (await scheduler.get_scheduler_stats())['total_rejected'] == 1
+        assert await scheduler.wait_all(['prio-ok-0', 'prio-ok-1'], timeout=5.0)
+        
+    finally:
+        await scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_spawned_on_demand(make_task):
+    """Test that worker processes are only started for process-routed tasks"""
+    scheduler = TaskScheduler(max_workers=1, queue_size=5)
+    await scheduler.start()
+    
+    try:
+        assert scheduler.worker_pool.process_executor is None
+        assert await scheduler.health_check()
+        
+        task_data = make_task(id='lazy-data', name='data_processing',
+                              payload={'data': [1, 2, 3]}, created_at=time.time())
+        assert await scheduler.submit_task(task_data)
+        assert await scheduler.wait_all(['lazy-data'], timeout=10.0)
+        assert scheduler.worker_pool.process_executor is not None
+        
+    finally:
+        await scheduler.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_completed_tasks_bounded(temp_db, make_task):
+    """Test that only the most recent completed_cap finished tasks are kept in memory
+    and evicted ones keep their final state in the database"""
+    scheduler = TaskScheduler(max_workers=1, queue_size=5, completed_cap=2)
+    await scheduler.start()
+    
+    try:
+        created_at = time.time()
+        task_ids = [f'cap-{i}' for i in range(3)]
+        for task_id in task_ids:
+            assert await scheduler.submit_task(make_task(
+                id=task_id, name='compute', payload={'iterations': 10}, created_at=created_at))
+        
+        assert await scheduler.wait_all(task_ids, timeout=5.0)
+        assert list(scheduler.completed_tasks) == ['cap-1', 'cap-2']
+        assert await scheduler.get_task_status('cap-0') is None
+        assert (await scheduler.get_scheduler_stats())['total_processed'] == 3
+        
+    finally:
+        # Waits for the eviction write
+        await scheduler.shutdown()
+    
+    persisted = await get_persisted_status('cap-0')
+    assert persisted['status'] == 'completed'
+    assert persisted['result']['success'] is True
+    assert persisted['completed_at'] is not None
+
+
+@pytest.mark.asyncio
+async def test_close_database_async_reopens_on_next_use(temp_db, make_task):
+    """Test that the loop-side close drops connections that later queries reopen"""
+    await save_tasks_to_database([make_task(
+        id='closed-db', name='compute', payload={'iterations': 10}, created_at='2026-01-01T00:00:00')])
+    
+    await close_database_async()
+    
+    assert (await get_persisted_status('closed-db'))['status'] == 'pending'
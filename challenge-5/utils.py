@@ -1,30 +1,115 @@
 import asyncio
+import heapq
+import json
 import multiprocessing as mp
 import sqlite3
-import json
+import orjson
 import time
 import psutil
 import os
-from typing import Any, Dict, Optional
+from array import array
+from collections import Counter
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
-from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, ALL_COMPLETED
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, ALL_COMPLETED, CancelledError
 import logging
 
-from models import TaskStatus, TaskPriority, WorkerInfo
+from models import TaskStatus, PriorityLevel, PRIORITY_LEVELS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Exact value types that are always JSON serializable on their own
+_JSON_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# Keys submit_task reads from a task dict; anything missing is rejected up front
+_REQUIRED_TASK_KEYS = frozenset(('id', 'name', 'payload', 'priority', 'max_retries', 'timeout', 'created_at'))
+
+# Starts a task's coroutine synchronously up to its first real suspension (3.12+)
+_EAGER_TASK_FACTORY = getattr(asyncio, 'eager_task_factory', None)
+
+# Worker result status string -> TaskStatus member
+_STATUS_BY_VALUE = {s.value: s for s in TaskStatus}
+# Resolved once; Enum.value is a property lookup on every access
+_COMPLETED = TaskStatus.COMPLETED.value
+_FAILED = TaskStatus.FAILED.value
+
+# This process's pid for worker results; refreshed in forked children so a
+# worker forked from a preloaded parent reports its own pid
+_PID = os.getpid()
+
+
+def _refresh_pid() -> None:
+    global _PID
+    _PID = os.getpid()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_refresh_pid)
+
+# SQLite database file; DB_PATH overrides it (``file:`` URIs such as shared
+# in-memory databases are supported)
+DEFAULT_DB_PATH = 'task_scheduler.db'
+
+# Number of recent task processing times kept for averaging (power of two)
+PROCESSING_TIME_WINDOW = 4096
+
+# Seconds a psutil/multiprocessing stats snapshot is reused before re-reading
+SYSTEM_STATS_TTL = 1.0
+
+# Finished tasks kept in memory for status queries; oldest are evicted first
+COMPLETED_TASKS_CAP = 10_000
+
+# Max tasks handed to the worker pool per dispatch-loop wake-up
+DISPATCH_BATCH = 8
+
+# data_processing lists longer than this stay in the parent's address space:
+# pickling them to a worker process and back costs more than processing them
+PROCESS_DATA_MAX_ITEMS = 1024
+
+
+# Start method for worker processes; the platform default unless overridden.
+# TASK_SCHEDULER_START_METHOD=forkserver starts workers from a small server
+# instead of forking the scheduler with its threads and full RSS, but like
+# spawn it re-imports __main__ (the entry script needs an
+# `if __name__ == "__main__":` guard) and the first process task waits
+# ~0.6s for the server to come up.
+START_METHOD = os.environ.get('TASK_SCHEDULER_START_METHOD') or None
+_MP_CONTEXT = mp.get_context(START_METHOD)
+if START_METHOD == 'forkserver':
+    _MP_CONTEXT.set_forkserver_preload(['models', 'utils'])
+
+
+# Last formatted wall-clock timestamp, shared by events within the same millisecond.
+# Unsynchronized: only the event-loop thread may use it (see now_iso).
+_NOW_NS = 0
+_NOW_ISO = ''
+
+
+def now_iso() -> str:
+    """Return an ISO timestamp, reformatted at most once per millisecond.
+
+    Event-loop thread only; code that can run in a worker thread or process
+    calls datetime.now().isoformat() itself.
+    """
+    global _NOW_NS, _NOW_ISO
+    now_ns = time.monotonic_ns()
+    if now_ns - _NOW_NS >= 1_000_000:
+        _NOW_NS = now_ns
+        _NOW_ISO = datetime.now().isoformat()
+    return _NOW_ISO
 
-@dataclass
+
+@dataclass(slots=True)
 class Task:
     """In-memory task record."""
     id: str
     name: str
     payload: Dict[str, Any]
-    priority: TaskPriority
+    priority: PriorityLevel
     max_retries: int
     timeout: int
     created_at: str
@@ -36,6 +121,10 @@ class Task:
     error_message: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
 
+    def worker_input(self) -> Dict[str, Any]:
+        """Fields TaskProcessor.process_task reads (shallow, unlike asdict's deep copy)."""
+        return {'id': self.id, 'name': self.name, 'payload': self.payload}
+
 
 class TaskProcessor:
     """Executes task logic (run in worker process/thread)."""
@@ -43,94 +132,219 @@ class TaskProcessor:
     @staticmethod
     def process_task(task_data: Dict[str, Any]) -> Dict[str, Any]:
         """Execute one task; return result dict with string status."""
-        start_time = time.time()
-        task_id = task_data['id']
-        task_name = task_data['name']
+        start_time = time.perf_counter()
         payload = task_data.get('payload', {}) or {}
+        try:
+            TaskProcessor._check_payload(payload)
+            result = TaskProcessor._execute_task(task_data['name'], payload)
+        except Exception as e:
+            return TaskProcessor._failed(task_data['id'], e, start_time)
+        return TaskProcessor._completed(task_data['id'], result, start_time)
 
+    @staticmethod
+    async def process_task_async(task_data: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Coroutine twin of process_task for ASYNC_TASK_HANDLERS task types; enforces timeout."""
+        start_time = time.perf_counter()
+        payload = task_data.get('payload', {}) or {}
         try:
-            result = TaskProcessor._execute_task(task_name, payload)
-            processing_time = (time.time() - start_time) * 1000.0
+            TaskProcessor._check_payload(payload)
+            result = await asyncio.wait_for(ASYNC_TASK_HANDLERS[task_data['name']](payload), timeout or None)
+        except asyncio.TimeoutError:
+            return TaskProcessor._failed(task_data['id'], _timeout_error(timeout), start_time)
+        except Exception as e:
+            return TaskProcessor._failed(task_data['id'], e, start_time)
+        return TaskProcessor._completed(task_data['id'], result, start_time)
 
-            return {
-                'task_id': task_id,
-                'status': TaskStatus.COMPLETED.value,  # <-- string 'completed'
-                'result': {
-                    'success': True,
-                    'result_data': result,
-                    'metrics': {'processing_time_ms': processing_time},
-                },
-                'processing_time_ms': processing_time,
-                'worker_pid': os.getpid(),
-                'completed_at': datetime.now().isoformat(),
-            }
+    @staticmethod
+    def _completed(task_id: str, result: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        processing_time = (time.perf_counter() - start_time) * 1000.0
+        return {
+            'task_id': task_id,
+            'status': _COMPLETED,  # <-- string 'completed'
+            'result': {
+                'success': True,
+                'result_data': result,
+                'metrics': {'processing_time_ms': processing_time},
+            },
+            'processing_time_ms': processing_time,
+            'worker_pid': _PID,
+            'completed_at': datetime.now().isoformat(),
+        }
 
-        except Exception as e:
-            processing_time = (time.time() - start_time) * 1000.0
+    @staticmethod
+    def _failed(task_id: str, error: Exception, start_time: float) -> Dict[str, Any]:
+        processing_time = (time.perf_counter() - start_time) * 1000.0
+        return {
+            'task_id': task_id,
+            'status': _FAILED,  # <-- string 'failed'
+            'result': {
+                'success': False,
+                'error_message': str(error),
+                'metrics': {'processing_time_ms': processing_time},
+            },
+            'error': str(error),
+            'processing_time_ms': processing_time,
+            'worker_pid': _PID,
+            'completed_at': datetime.now().isoformat(),
+        }
 
-            return {
-                'task_id': task_id,
-                'status': TaskStatus.FAILED.value,  # <-- string 'failed'
-                'result': {
-                    'success': False,
-                    'error_message': str(e),
-                    'metrics': {'processing_time_ms': processing_time},
-                },
-                'error': str(e),
-                'processing_time_ms': processing_time,
-                'worker_pid': os.getpid(),
-                'completed_at': datetime.now().isoformat(),
-            }
+    @staticmethod
+    def _check_payload(payload: Dict[str, Any]) -> None:
+        """Fail the task (not the submission) if its payload is not JSON serializable."""
+        # Flat payloads of scalars (the common case) need no encode pass
+        if _JSON_SCALAR_TYPES.issuperset(map(type, payload.values())):
+            return
+        try:
+            _to_json(payload)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Payload must be JSON serializable: {e}")
 
     @staticmethod
     def _execute_task(task_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Dispatch concrete task types (compute|io_operation|data_processing|error_task)."""
-        if task_name == "compute":
-            iterations = int(payload.get('iterations', 1_000_000))
-            result = sum(i * i for i in range(iterations))
-            return {'result': result, 'iterations': iterations}
+        """Dispatch concrete task types via TASK_HANDLERS."""
+        handler = TASK_HANDLERS.get(task_name)
+        if handler is None:
+            # Unknown task types should FAIL (so tests see status == 'failed')
+            raise ValueError(f"Unknown task type: {task_name}")
+        return handler(payload)
 
-        elif task_name == "io_operation":
-            duration = float(payload.get('duration', 1.0))
-            time.sleep(duration)  # runs in worker thread
-            return {'slept_for': duration, 'timestamp': datetime.now().isoformat()}
 
-        elif task_name == "data_processing":
-            data = payload.get('data', [])
-            if not isinstance(data, list):
-                raise ValueError("Data must be a list")
-            processed = [
-                (item * 2 if isinstance(item, (int, float)) else str(item).upper())
-                for item in data
-            ]
-            return {'original_count': len(data), 'processed_data': processed}
+def _timeout_error(timeout: Optional[float]) -> TimeoutError:
+    return TimeoutError(f"Task timed out after {timeout}s")
 
-        elif task_name == "error_task":
-            raise Exception("Intentional task failure for testing")
 
-        # ⬇️ Unknown task types should FAIL (so tests see status == 'failed')
-        raise ValueError(f"Unknown task type: {task_name}")
+def _cancel_timer(loop: asyncio.AbstractEventLoop, handle: asyncio.TimerHandle, _future: Future) -> None:
+    try:
+        loop.call_soon_threadsafe(handle.cancel)
+    except RuntimeError:
+        pass  # loop already closed; the timer went with it
 
 
+def _run_compute(payload: Dict[str, Any]) -> Dict[str, Any]:
+    iterations = int(payload.get('iterations', 1_000_000))
+    # Closed form of sum(i * i for i in range(n)); exact with Python ints
+    n = max(iterations, 0)
+    result = (n - 1) * n * (2 * n - 1) // 6
+    return {'result': result, 'iterations': iterations}
 
 
+def _run_io_operation(payload: Dict[str, Any]) -> Dict[str, Any]:
+    duration = float(payload.get('duration', 1.0))
+    time.sleep(duration)  # runs in worker thread
+    return {'slept_for': duration, 'timestamp': datetime.now().isoformat()}
+
+
+async def _run_io_operation_async(payload: Dict[str, Any]) -> Dict[str, Any]:
+    duration = float(payload.get('duration', 1.0))
+    await asyncio.sleep(duration)  # runs on the scheduler's event loop
+    return {'slept_for': duration, 'timestamp': now_iso()}
+
+
+def _run_data_processing(payload: Dict[str, Any]) -> Dict[str, Any]:
+    data = payload.get('data', [])
+    if not isinstance(data, list):
+        raise ValueError("Data must be a list")
+    processed = [
+        (item * 2 if isinstance(item, (int, float)) else str(item).upper())
+        for item in data
+    ]
+    return {'original_count': len(data), 'processed_data': processed}
+
+
+def _run_error_task(payload: Dict[str, Any]) -> Dict[str, Any]:
+    raise Exception("Intentional task failure for testing")
+
+
+# Task name -> handler(payload); one dict lookup instead of an if/elif chain.
+# Handlers treat payload as read-only, so callers may share one payload dict.
+TASK_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'compute': _run_compute,
+    'io_operation': _run_io_operation,
+    'data_processing': _run_data_processing,
+    'error_task': _run_error_task,
+}
+
+# Task types that only wait; WorkerPool runs these as coroutines on the event
+# loop instead of parking an executor thread for the whole wait
+ASYNC_TASK_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+    'io_operation': _run_io_operation_async,
+}
+
+
+class DispatchHeap:
+    """Bounded priority queue used as the scheduler's dispatch queue.
+
+    A plain ``heapq`` list of ``(-priority, seq, item)`` entries: higher
+    priority pops first and ``seq`` keeps FIFO order within a level.
+    Producers and the single consumer share one event loop, so no lock is
+    needed and one Event wakes the consumer when the heap leaves empty.
+    """
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self._heap: list = []
+        self._seq = 0
+        self._not_empty = asyncio.Event()
+
+    def qsize(self) -> int:
+        return len(self._heap)
+
+    def empty(self) -> bool:
+        return not self._heap
+
+    def full(self) -> bool:
+        return len(self._heap) >= self.maxsize
+
+    def put_nowait(self, item, priority: int = 0) -> bool:
+        """Push item; return False instead of raising when full."""
+        if len(self._heap) >= self.maxsize:
+            return False
+        if not self._heap:
+            self._not_empty.set()
+        heapq.heappush(self._heap, (-priority, self._seq, item))
+        self._seq += 1
+        return True
+
+    def clear(self) -> None:
+        self._heap.clear()
+
+    def get_nowait(self):
+        if not self._heap:
+            raise IndexError("get from empty DispatchHeap")
+        return heapq.heappop(self._heap)[2]
+
+    async def get(self):
+        while not self._heap:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self.get_nowait()
+
 
 class WorkerPool:
     """Hybrid execution pool (processes for CPU-bound, threads for others)."""
-    CPU_BOUND_TASKS = {"compute"}  # route these to ProcessPoolExecutor
+    CPU_BOUND_TASKS = {"data_processing"}  # route these to ProcessPoolExecutor
+    # Constant-time work (compute is closed-form): cheaper than any executor hop
+    INLINE_TASKS = {"compute", "error_task"}
+    LOOP_TASKS = set(ASYNC_TASK_HANDLERS)  # awaited on the event loop, no executor
 
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = 4, process_executor: Optional[ProcessPoolExecutor] = None):
         self.max_workers = max_workers
         self.thread_executor: Optional[ThreadPoolExecutor] = None
         self.process_executor: Optional[ProcessPoolExecutor] = None
+        # A caller-supplied process pool is reused as-is and never shut down here
+        self._shared_process_executor = process_executor
         self.active_tasks: Dict[str, Future] = {}
-        self._task_exec_map: Dict[str, str] = {}  # task_id -> "thread" | "process"
+        self._task_exec_map: Dict[str, str] = {}  # task_id -> "thread" | "process" | "inline" | "loop"
+        self._loop_tasks: set = set()  # strong refs so running coroutines aren't collected
         self.worker_stats: Dict[int, Dict] = {}
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
 
     async def start(self):
         self.thread_executor = ThreadPoolExecutor(max_workers=self.max_workers)
-        self.process_executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        # Worker processes are only spawned once a process-routed task arrives
+        self.process_executor = self._shared_process_executor
         logger.info(f"Started worker pool with {self.max_workers} workers (threads + processes)")
 
     async def stop(self):
@@ -152,21 +366,31 @@ class WorkerPool:
             self.thread_executor.shutdown(wait=True)
             self.thread_executor = None
         if self.process_executor:
-            self.process_executor.shutdown(wait=True)
+            if self.process_executor is not self._shared_process_executor:
+                self.process_executor.shutdown(wait=True)
             self.process_executor = None
 
         self.active_tasks.clear()
         self._task_exec_map.clear()
         logger.info("Worker pool stopped")
 
-    async def submit_task(self, task: Task) -> str:
-        if not (self.thread_executor and self.process_executor):
+    async def submit_task(self, task: Task, on_done: Optional[Callable[[Future], None]] = None) -> str:
+        if not self.thread_executor:
             raise RuntimeError("Worker pool not started")
 
-        task_data = asdict(task)
+        task_data = task.worker_input()
         # Route CPU-bound tasks to processes, others to threads
-        use_process = task.name in self.CPU_BOUND_TASKS
-        if use_process:
+        use_process = task.name in self.CPU_BOUND_TASKS and not self._large_payload(task.payload)
+        if task.name in self.INLINE_TASKS:
+            future = Future()
+            future.set_result(TaskProcessor.process_task(task_data))
+            exec_kind = "inline"
+        elif task.name in self.LOOP_TASKS:
+            future = self._run_on_loop(task_data, task.timeout)
+            exec_kind = "loop"
+        elif use_process:
+            if self.process_executor is None:
+                self.process_executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_MP_CONTEXT)
             future = self.process_executor.submit(TaskProcessor.process_task, task_data)
             exec_kind = "process"
         else:
@@ -175,58 +399,167 @@ class WorkerPool:
 
         self.active_tasks[task.id] = future
         self._task_exec_map[task.id] = exec_kind
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        if exec_kind in ("thread", "process") and task.timeout:
+            loop = asyncio.get_running_loop()
+            handle = loop.call_later(
+                task.timeout, self._expire, task.id, future, task.timeout, time.perf_counter(), on_done
+            )
+            # Executor futures complete on a worker thread; TimerHandle.cancel
+            # is not thread-safe, so hop back to the loop to drop the timer
+            future.add_done_callback(partial(_cancel_timer, loop, handle))
         return task.id
 
+    def _expire(self, task_id: str, future: Future, timeout: float, start_time: float,
+                on_done: Optional[Callable[[Future], None]]) -> None:
+        """Fail an executor task still running at its deadline.
+
+        A running thread or process cannot be interrupted: it keeps running
+        and keeps holding its executor slot until the handler returns, so a
+        pool of max_workers can be fully occupied by expired tasks. Its late
+        result is ignored.
+        """
+        if future.done() or self.active_tasks.get(task_id) is not future:
+            return
+        future.cancel()  # only succeeds if the executor has not started it yet
+        expired = Future()
+        expired.set_result(TaskProcessor._failed(task_id, _timeout_error(timeout), start_time))
+        self.active_tasks[task_id] = expired
+        if on_done is not None:
+            on_done(expired)
+
+    def _run_on_loop(self, task_data: Dict[str, Any], timeout: Optional[float] = None) -> Future:
+        """Run process_task_async on the running loop behind a concurrent Future."""
+        future = Future()
+        loop = asyncio.get_running_loop()
+        coro = TaskProcessor.process_task_async(task_data, timeout)
+        aio_task = _EAGER_TASK_FACTORY(loop, coro) if _EAGER_TASK_FACTORY else loop.create_task(coro)
+        self._loop_tasks.add(aio_task)
+
+        def _finish(done: asyncio.Task) -> None:
+            self._loop_tasks.discard(done)
+            if future.done():
+                return
+            if done.cancelled():
+                future.cancel()
+            else:
+                future.set_result(done.result())
+
+        aio_task.add_done_callback(_finish)
+        future.add_done_callback(lambda f: f.cancelled() and aio_task.cancel())
+        return future
+
+    @staticmethod
+    def _large_payload(payload: Dict[str, Any]) -> bool:
+        data = payload.get('data') if payload else None
+        return isinstance(data, list) and len(data) > PROCESS_DATA_MAX_ITEMS
+
     async def get_task_result(self, task_id: str) -> Optional[Dict[str, Any]]:
         future = self.active_tasks.get(task_id)
         if future is None:
             return None
 
-        if future.done():
-            try:
-                result = future.result()
-            except Exception as e:
-                result = {'task_id': task_id, 'status': TaskStatus.FAILED.value if hasattr(TaskStatus, "FAILED") else TaskStatus.FAILED, 'error': str(e)}
-            finally:
-                self.active_tasks.pop(task_id, None)
-                self._task_exec_map.pop(task_id, None)
-            return result
-
-        return None
+        # done() is one lock acquisition and returns at once for a pending future;
+        # result(timeout=0) would wait on the condition and raise TimeoutError
+        if not future.done():
+            return None  # still running
+        try:
+            result = future.result()  # finished, so this does not wait
+        except (Exception, CancelledError) as e:
+            result = {'task_id': task_id, 'status': _FAILED, 'error': str(e)}
+        self.active_tasks.pop(task_id, None)
+        self._task_exec_map.pop(task_id, None)
+        return result
 
     def get_active_task_count(self) -> int:
         return len(self.active_tasks)
 
+    def is_active(self) -> bool:
+        return self.thread_executor is not None or self.process_executor is not None
+
     def get_worker_stats(self) -> Dict[str, Any]:
         return {
             'max_workers': self.max_workers,
             'active_tasks': len(self.active_tasks),
-            'uptime_seconds': time.time() - self.start_time,
+            'uptime_seconds': time.monotonic() - self.start_time,
         }
 
 
+class _CompletionLatch:
+    """Resolves its future once ``count_down`` has been called ``remaining`` times."""
+    __slots__ = ('future', 'remaining')
+
+    def __init__(self, future: asyncio.Future, remaining: int):
+        self.future = future
+        self.remaining = remaining
+
+    def count_down(self) -> None:
+        self.remaining -= 1
+        if self.remaining == 0 and not self.future.done():
+            self.future.set_result(None)
+
+
+def _task_record(task: Task) -> Dict[str, Any]:
+    """Task -> row dict in the shape save_tasks_to_database expects."""
+    return {
+        'id': task.id,
+        'name': task.name,
+        'payload': task.payload,
+        'priority': task.priority.name.lower(),
+        'status': task.status.value,
+        'created_at': task.created_at,
+        'started_at': task.started_at,
+        'completed_at': task.completed_at,
+        'result': task.result,
+        'error_message': task.error_message,
+        'retry_count': task.retry_count,
+    }
+
+
 class TaskScheduler:
     """Coordinates queueing, dispatch, completion tracking, and stats."""
 
-    def __init__(self, max_workers: int = 4, queue_size: int = 100):
+    def __init__(self, max_workers: int = 4, queue_size: int = 100,
+                 process_executor: Optional[ProcessPoolExecutor] = None,
+                 completed_cap: int = COMPLETED_TASKS_CAP):
         self.max_workers = max_workers
         self.queue_size = queue_size
-        self.task_queue: asyncio.Queue = None
-        self.worker_pool = WorkerPool(max_workers)
+        self.completed_cap = completed_cap
+        self.task_queue: Optional[DispatchHeap] = None
+        self.worker_pool = WorkerPool(max_workers, process_executor)
         self.active_tasks: Dict[str, Task] = {}
+        # Insertion-ordered, so the first key is always the oldest finished task
         self.completed_tasks: Dict[str, Task] = {}
         self.running = False
         self.processing_task = None
+        # Only touched on the event loop (worker completions hop over via
+        # call_soon_threadsafe), so plain ints need no lock or sharding
         self.stats = {
             'total_submitted': 0,
             'total_processed': 0,
             'total_failed': 0,
-            'total_cancelled': 0
+            'total_cancelled': 0,
+            'total_rejected': 0
         }
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
+        # Ring of recent processing times (ms); a flat double array instead of per-task floats
+        self._processing_times = array('d', bytes(8 * PROCESSING_TIME_WINDOW))
+        self._processing_time_count = 0
+        # Bumped on every status transition so callers can cache per (task, version)
+        self._task_versions: Dict[str, int] = {}
+        # task_id -> latches of the wait_all calls waiting on it
+        self._completion_waiters: Dict[str, List[_CompletionLatch]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Ids whose worker future finished since the last sweep; sweeps only visit these
+        self._finished_ids: List[str] = []
+        self._sweep_scheduled = False
+        # In-flight writes of evicted tasks; shutdown waits for them
+        self._persist_tasks: set = set()
 
     async def start(self):
-        self.task_queue = asyncio.Queue(maxsize=self.queue_size)
+        self._loop = asyncio.get_running_loop()
+        self.task_queue = DispatchHeap(self.queue_size)
         await self.worker_pool.start()
         self.running = True
         self.processing_task = asyncio.create_task(self._process_tasks())
@@ -248,8 +581,8 @@ class TaskScheduler:
 
         # Let the processing loop flush the queue / active tasks
         max_shutdown_wait = 10  # seconds
-        shutdown_start = time.time()
-        while (time.time() - shutdown_start) < max_shutdown_wait:
+        shutdown_start = time.monotonic()
+        while (time.monotonic() - shutdown_start) < max_shutdown_wait:
             if self.task_queue.empty() and not self.active_tasks:
                 break
             await self._check_completed_tasks()
@@ -268,6 +601,8 @@ class TaskScheduler:
 
         # Final sweep of completions
         await self._check_completed_tasks()
+        if self._persist_tasks:
+            await asyncio.gather(*self._persist_tasks)
 
         logger.info("Task scheduler shutdown complete")
 
@@ -275,108 +610,247 @@ class TaskScheduler:
         """Alias for shutdown (compat)."""
         await self.shutdown()
 
+    async def reset(self, timeout: float = 10) -> None:
+        """Drop queued tasks, let in-flight ones finish, and zero all tracking state."""
+        self.task_queue.clear()
+        await self.wait_all(list(self.active_tasks), timeout=timeout)
+        self.active_tasks.clear()
+        self.completed_tasks.clear()
+        self._task_versions.clear()
+        self._completion_waiters.clear()
+        self._finished_ids.clear()
+        for key in self.stats:
+            self.stats[key] = 0
+        self._processing_time_count = 0
+        self.start_time = time.monotonic()
+
     async def submit_task(self, task_data: Dict[str, Any]) -> bool:
         if not self.running:
             return False
-        try:
-            task = Task(
-                id=task_data['id'],
-                name=task_data['name'],
-                payload=task_data['payload'],
-                priority=TaskPriority(task_data['priority']),
-                max_retries=task_data['max_retries'],
-                timeout=task_data['timeout'],
-                created_at=task_data['created_at'],
-                status=TaskStatus.PENDING
-            )
-            self.task_queue.put_nowait(task)
-            self.stats['total_submitted'] += 1
-            return True
-        except asyncio.QueueFull:
+        return self._enqueue(task_data)
+
+    async def submit_tasks(self, tasks: Iterable[Dict[str, Any]]) -> List[bool]:
+        """Bulk submit_task: enqueue every task in one pass and return the accepted flags."""
+        if not self.running:
+            return [False for _ in tasks]
+        enqueue = self._enqueue
+        return [enqueue(task_data) for task_data in tasks]
+
+    def _enqueue(self, task_data: Dict[str, Any]) -> bool:
+        if not _REQUIRED_TASK_KEYS.issubset(task_data):
+            self.stats['total_rejected'] += 1
+            return False
+        priority = PRIORITY_LEVELS.get(task_data['priority'])
+        if priority is None:
+            # Rejected like any other bad task, so one bad entry can't abort a batch
+            self.stats['total_rejected'] += 1
+            return False
+        # Positional in Task field order: skips the kwargs dict on the hot path.
+        task = Task(
+            task_data['id'], task_data['name'], task_data['payload'], priority,
+            task_data['max_retries'], task_data['timeout'], task_data['created_at'],
+            TaskStatus.PENDING,
+        )
+        # put_nowait is the capacity check; a full queue costs one len() compare
+        if not self.task_queue.put_nowait(task, task.priority):
+            self.stats['total_rejected'] += 1
             return False
+        self._bump_version(task.id)
+        self.stats['total_submitted'] += 1
+        return True
 
     async def _process_tasks(self):
         logger.info("Starting task processing loop")
         while self.running:
             try:
-                task = await asyncio.wait_for(self.task_queue.get(), timeout=0.5)
-                logger.info(f"Processing task: {task.id}")
+                # No timeout: completions arrive through _notify_done, not by polling
+                task = await self.task_queue.get()
+                # Drain whatever else is queued so one wake-up dispatches a batch
+                batch = [task]
+                while len(batch) < DISPATCH_BATCH and not self.task_queue.empty():
+                    batch.append(self.task_queue.get_nowait())
 
-                task.status = TaskStatus.RUNNING
-                task.started_at = datetime.now().isoformat()
-                self.active_tasks[task.id] = task
+                for task in batch:
+                    await self._dispatch(task)
 
-                await self.worker_pool.submit_task(task)
-
-                await self._check_completed_tasks()
-            except asyncio.TimeoutError:
                 await self._check_completed_tasks()
-                continue
             except Exception as e:
                 logger.error(f"Error in task processing loop: {e}")
                 await asyncio.sleep(1)
 
+    async def _dispatch(self, task: Task):
+        logger.info(f"Processing task: {task.id}")
+        task.status = TaskStatus.RUNNING
+        task.started_at = now_iso()
+        self.active_tasks[task.id] = task
+        self._bump_version(task.id)
+        await self.worker_pool.submit_task(task, on_done=partial(self._notify_done, task.id))
+
     async def _check_completed_tasks(self):
-        completed_task_ids = []
+        if not self._finished_ids:
+            return
+        finished, self._finished_ids = self._finished_ids, []
 
-        for task_id, task in list(self.active_tasks.items()):
+        for task_id in finished:
+            # Also drains results of tasks cancelled here while their worker ran
             result = await self.worker_pool.get_task_result(task_id)
-            if result:
-                status_raw = result.get('status')
-                # Normalize to string for comparisons
-                status_str = status_raw.value if hasattr(status_raw, "value") else str(status_raw)
-                logger.info(f"Task {task_id} completed with status: {status_str}")
-
-                # Store enum on the task (if you prefer), but use string for logic
-                try:
-                    task.status = TaskStatus(status_str)
-                except Exception:
-                    # Fallback if status_str already is enum name or unrecognized
-                    task.status = TaskStatus.COMPLETED if status_str == "completed" else TaskStatus.FAILED
+            task = self.active_tasks.get(task_id)
+            if result and task is not None:
+                # Resolve to the enum member once; later checks are identity compares.
+                # TaskStatus is a str enum, so members and their values hash alike.
+                status = _STATUS_BY_VALUE.get(result.get('status'), TaskStatus.FAILED)
+                logger.info(f"Task {task_id} completed with status: {status.value}")
+                task.status = status
 
                 task.completed_at = result.get('completed_at')
+                processing_time = result.get('processing_time_ms')
+                if processing_time is not None:
+                    self._record_processing_time(processing_time)
 
-                if status_str == "completed":
+                if status is TaskStatus.COMPLETED:
                     task.result = result.get('result')
                     self.stats['total_processed'] += 1
                 else:
                     task.error_message = result.get('error')
                     self.stats['total_failed'] += 1
 
-                self.completed_tasks[task_id] = task
-                completed_task_ids.append(task_id)
+                del self.active_tasks[task_id]
+                self._finish(task_id, task)
+
+    def _notify_done(self, task_id: str, _future: Future) -> None:
+        # Runs on the executor's thread; hop back to the loop to record the id.
+        # Not gated on running: shutdown still drains what finishes meanwhile.
+        try:
+            self._loop.call_soon_threadsafe(self._mark_done, task_id)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    def _mark_done(self, task_id: str) -> None:
+        self._finished_ids.append(task_id)
+        self._schedule_sweep()
+
+    def _schedule_sweep(self) -> None:
+        if not self._sweep_scheduled and self.running:
+            self._sweep_scheduled = True
+            self._loop.create_task(self._sweep())
 
-        for task_id in completed_task_ids:
-            self.active_tasks.pop(task_id, None)
+    async def _sweep(self) -> None:
+        self._sweep_scheduled = False
+        await self._check_completed_tasks()
+
+    def _finish(self, task_id: str, task: Task) -> None:
+        """Move task into completed_tasks, wake its waiters, and evict past completed_cap."""
+        self.completed_tasks[task_id] = task
+        self._bump_version(task_id)
+        self._signal_completion(task_id)
+        completed = self.completed_tasks
+        if len(completed) <= self.completed_cap:
+            return
+        evicted = []
+        while len(completed) > self.completed_cap:
+            oldest = next(iter(completed))
+            evicted.append(_task_record(completed.pop(oldest)))
+            self._task_versions.pop(oldest, None)
+        # The database row was written at submission as pending; record the
+        # final state so status lookups that fall back to it stay correct
+        persist = self._loop.create_task(save_tasks_to_database(evicted))
+        self._persist_tasks.add(persist)
+        persist.add_done_callback(self._persist_tasks.discard)
+
+    def _signal_completion(self, task_id: str) -> None:
+        for latch in self._completion_waiters.pop(task_id, ()):
+            latch.count_down()
+
+    async def wait_all(self, task_ids: Iterable[str], timeout: Optional[float] = None) -> bool:
+        """Wait until every task in task_ids has finished; return False on timeout."""
+        if self.running:
+            await self._check_completed_tasks()
+        # Unknown ids (never queued, or evicted after finishing) have nothing to wait for
+        versions, completed = self._task_versions, self.completed_tasks
+        pending = {task_id for task_id in task_ids if task_id in versions and task_id not in completed}
+        if not pending:
+            return True
+        # One future per call, counted down by completions; no per-task Event or Task
+        latch = _CompletionLatch(asyncio.get_running_loop().create_future(), len(pending))
+        for task_id in pending:
+            self._completion_waiters.setdefault(task_id, []).append(latch)
+        done, _ = await asyncio.wait((latch.future,), timeout=timeout)
+        if not done:
+            for task_id in pending:
+                latches = self._completion_waiters.get(task_id)
+                if latches is not None and latch in latches:
+                    latches.remove(latch)
+                    if not latches:
+                        del self._completion_waiters[task_id]
+        return bool(done)
+
+    def _bump_version(self, task_id: str) -> None:
+        self._task_versions[task_id] = self._task_versions.get(task_id, 0) + 1
+
+    async def get_task_version(self, task_id: str) -> Optional[int]:
+        """Return the task's status version (changes on every transition), or None if unknown."""
+        if self.running:
+            await self._check_completed_tasks()
+        return self._task_versions.get(task_id)
+
+    def _record_processing_time(self, ms: float) -> None:
+        self._processing_times[self._processing_time_count & (PROCESSING_TIME_WINDOW - 1)] = ms
+        self._processing_time_count += 1
+
+    def _average_processing_time(self) -> float:
+        n = min(self._processing_time_count, PROCESSING_TIME_WINDOW)
+        if n == 0:
+            return 0.0
+        if n == PROCESSING_TIME_WINDOW:
+            return sum(self._processing_times) / n
+        return sum(self._processing_times[:n]) / n
 
     async def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
         # Keep statuses fresh
         if self.running:
             await self._check_completed_tasks()
+        return self._status_of(task_id)
 
-        if task_id in self.active_tasks:
-            task = self.active_tasks[task_id]
+    async def get_task_statuses(self, task_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Bulk get_task_status: one completion sweep for the whole batch."""
+        if self.running:
+            await self._check_completed_tasks()
+        return [self._status_of(task_id) for task_id in task_ids]
+
+    async def count_statuses(self, task_ids: Iterable[str]) -> Dict[str, int]:
+        """Return {status: count} for task_ids without building per-task status dicts."""
+        if self.running:
+            await self._check_completed_tasks()
+        active, completed = self.active_tasks, self.completed_tasks
+        counts = Counter(
+            task.status.value
+            for task in (active.get(task_id) or completed.get(task_id) for task_id in task_ids)
+            if task is not None
+        )
+        return dict(counts)
+
+    def _status_of(self, task_id: str) -> Optional[Dict[str, Any]]:
+        task = self.active_tasks.get(task_id)
+        if task is not None:
             # Return string status for tests
-            status_str = task.status.value if hasattr(task.status, "value") else str(task.status)
             return {
                 'task_id': task.id,
-                'status': status_str,
+                'status': task.status.value,
                 'started_at': task.started_at,
                 'worker_id': task.worker_id,
-                'progress': 50 if status_str == "running" else 0,
+                'progress': 50 if task.status is TaskStatus.RUNNING else 0,
             }
 
-        if task_id in self.completed_tasks:
-            task = self.completed_tasks[task_id]
-            status_str = task.status.value if hasattr(task.status, "value") else str(task.status)
+        task = self.completed_tasks.get(task_id)
+        if task is not None:
             return {
                 'task_id': task.id,
-                'status': status_str,
+                'status': task.status.value,
                 'started_at': task.started_at,
                 'completed_at': task.completed_at,
                 'result': task.result,
                 'error': task.error_message,
-                'progress': 100 if status_str == "completed" else 0,
+                'progress': 100 if task.status is TaskStatus.COMPLETED else 0,
             }
 
         return None
@@ -386,28 +860,38 @@ class TaskScheduler:
             task = self.active_tasks[task_id]
             task.status = TaskStatus.CANCELLED
             self.stats['total_cancelled'] += 1
-            self.completed_tasks[task_id] = task
             del self.active_tasks[task_id]
+            self._finish(task_id, task)
             return True
         return False
 
+    async def submit_and_describe(self, task_data: Dict[str, Any]) -> Tuple[bool, int, Optional[str]]:
+        """Submit task and return (accepted, queue_position, estimated_start_time) in one call."""
+        if not await self.submit_task(task_data):
+            return False, 0, None
+        queue_size = self.task_queue.qsize()
+        return True, queue_size, self._estimate_start(queue_size)
+
     async def get_queue_position(self, task_id: str) -> int:
         return self.task_queue.qsize()
 
     async def estimate_start_time(self, task_id: str) -> Optional[str]:
-        queue_size = self.task_queue.qsize()
+        return self._estimate_start(self.task_queue.qsize())
+
+    def _estimate_start(self, queue_size: int) -> str:
         if queue_size == 0:
-            return datetime.now().isoformat()
+            return now_iso()
         avg_time = 30  # seconds (simple heuristic)
         estimated_delay = (queue_size * avg_time) / self.max_workers
         return (datetime.now() + timedelta(seconds=estimated_delay)).isoformat()
 
     async def get_worker_stats(self) -> Dict[str, Any]:
-        pool = self.worker_pool.get_worker_stats()
+        # All counters are maintained incrementally; nothing here scans tasks
+        in_flight = len(self.worker_pool.active_tasks)
         return {
             'total_workers': self.max_workers,
-            'active_workers': min(pool['active_tasks'], self.max_workers),
-            'idle_workers': max(0, self.max_workers - pool['active_tasks']),
+            'active_workers': min(in_flight, self.max_workers),
+            'idle_workers': max(0, self.max_workers - in_flight),
             'workers': [],
             'queue_size': self.task_queue.qsize(),
             'completed_tasks': self.stats['total_processed'],
@@ -415,94 +899,183 @@ class TaskScheduler:
         }
 
     async def get_scheduler_stats(self) -> Dict[str, Any]:
-        uptime = time.time() - self.start_time
+        return self._scheduler_stats()
+
+    async def get_combined_metrics(self) -> Dict[str, Any]:
+        """Return system + scheduler metrics in SystemMetricsResponse field names."""
+        system = await get_system_metrics()
+        stats = self._scheduler_stats()
+        return {
+            'uptime_seconds': system['uptime_seconds'],
+            'cpu_usage_percent': system['cpu_usage_percent'],
+            'memory_usage_mb': system['memory_usage_mb'],
+            'total_tasks_processed': stats['total_processed'],
+            'tasks_per_second': stats['throughput'],
+            'average_task_time_ms': stats['avg_processing_time'],
+            'worker_utilization': stats['worker_utilization'],
+            'queue_utilization': stats['queue_utilization'],
+        }
+
+    def _scheduler_stats(self) -> Dict[str, Any]:
+        uptime = time.monotonic() - self.start_time
         total_processed = self.stats['total_processed']
         return {
             'total_processed': total_processed,
+            'total_rejected': self.stats['total_rejected'],
             'throughput': total_processed / max(uptime, 1),
-            'avg_processing_time': 1000,  # Placeholder
+            'avg_processing_time': self._average_processing_time(),
             'worker_utilization': (len(self.active_tasks) / self.max_workers) * 100,
             'queue_utilization': (self.task_queue.qsize() / self.queue_size) * 100,
         }
 
     async def health_check(self) -> bool:
-        """Return True if running and pool active."""
-        return self.running and any((
-            getattr(self.worker_pool, "executor", None),         # old single-executor
-            getattr(self.worker_pool, "thread_executor", None),  # new hybrid thread pool
-            getattr(self.worker_pool, "process_executor", None), # new hybrid process pool
-        ))
+        """Return True if running, the dispatch loop is alive and the pool active."""
+        loop_task = self.processing_task
+        return (
+            self.running
+            and loop_task is not None and not loop_task.done()
+            and self.worker_pool.is_active()
+        )
 
     async def worker_pool_active(self) -> bool:
         """Return True if any executor alive."""
-        return any((
-            getattr(self.worker_pool, "executor", None),
-            getattr(self.worker_pool, "thread_executor", None),
-            getattr(self.worker_pool, "process_executor", None),
-        ))
+        return self.worker_pool.is_active()
 
 
 # Database operations
+_CREATE_TASKS_SQL = '''
+    CREATE TABLE IF NOT EXISTS tasks (
+        id TEXT PRIMARY KEY,
+        name TEXT,
+        payload TEXT,
+        priority TEXT,
+        status TEXT,
+        created_at TEXT,
+        started_at TEXT,
+        completed_at TEXT,
+        result TEXT,
+        error_message TEXT,
+        processing_time_ms REAL,
+        retry_count INTEGER
+    )
+'''
+_UPSERT_TASK_SQL = '''
+    INSERT OR REPLACE INTO tasks 
+    (id, name, payload, priority, status, created_at, started_at, completed_at, 
+     result, error_message, processing_time_ms, retry_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_SELECT_TASK_SQL = 'SELECT * FROM tasks WHERE id = ?'
+_DELETE_FINISHED_SQL = '''
+    DELETE FROM tasks 
+    WHERE status IN ('completed', 'failed', 'cancelled') 
+    AND completed_at < ?
+'''
+
+# All database work runs on this one thread, off the event loop; its
+# connections stay open so sqlite3's per-connection statement cache is reused
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='task-db')
+_connections: Dict[str, sqlite3.Connection] = {}
+
+
+def _connect() -> sqlite3.Connection:
+    """Return the long-lived connection for DB_PATH (or DEFAULT_DB_PATH); DB thread only."""
+    path = os.environ.get('DB_PATH', DEFAULT_DB_PATH)
+    conn = _connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, uri=path.startswith('file:'), check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute(_CREATE_TASKS_SQL)
+        conn.commit()
+        _connections[path] = conn
+    return conn
+
+
+def _close_connections() -> None:
+    while _connections:
+        _connections.popitem()[1].close()
+
+
+def close_database() -> None:
+    """Close the cached database connections (they reopen on next use).
+
+    Blocks until the database thread is done; on the event loop use
+    close_database_async instead.
+    """
+    _DB_EXECUTOR.submit(_close_connections).result()
+
+
+async def _run_db(fn: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_DB_EXECUTOR, fn, *args)
+
+
+async def close_database_async() -> None:
+    """close_database for the event loop: waits for the database thread without blocking."""
+    await _run_db(_close_connections)
+
+
+def _to_json(value: Any) -> str:
+    """Encode a payload/result column; non-str keys are stringified like json.dumps does."""
+    try:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    except orjson.JSONEncodeError:
+        # orjson stops at 64-bit integers; the stdlib encoder takes any size
+        return json.dumps(value)
+
+
+def _task_row(task: Dict[str, Any]) -> tuple:
+    """Map task dict -> tasks table row."""
+    return (
+        task['id'],
+        task['name'],
+        _to_json(task['payload']),
+        task['priority'],
+        task['status'],
+        task['created_at'],
+        task.get('started_at'),
+        task.get('completed_at'),
+        _to_json(task.get('result')) if task.get('result') else None,
+        task.get('error_message'),
+        task.get('processing_time_ms'),
+        task.get('retry_count', 0)
+    )
+
+
+def _save_rows(rows: List[tuple]) -> None:
+    conn = _connect()
+    with conn:
+        conn.executemany(_UPSERT_TASK_SQL, rows)
+
+
+def _fetch_row(task_id: str) -> Optional[tuple]:
+    return _connect().execute(_SELECT_TASK_SQL, (task_id,)).fetchone()
+
+
+def _delete_finished(cutoff_time: str) -> int:
+    conn = _connect()
+    with conn:
+        return conn.execute(_DELETE_FINISHED_SQL, (cutoff_time,)).rowcount
+
+
 async def save_task_to_database(task: Dict[str, Any]):
     """Persist task row (upsert)."""
+    await save_tasks_to_database([task])
+
+
+async def save_tasks_to_database(tasks: List[Dict[str, Any]]):
+    """Persist many task rows (upsert) in one transaction."""
     try:
-        conn = sqlite3.connect('task_scheduler.db')
-        cursor = conn.cursor()
-        
-        # Create table if it doesn't exist
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id TEXT PRIMARY KEY,
-                name TEXT,
-                payload TEXT,
-                priority TEXT,
-                status TEXT,
-                created_at TEXT,
-                started_at TEXT,
-                completed_at TEXT,
-                result TEXT,
-                error_message TEXT,
-                processing_time_ms REAL,
-                retry_count INTEGER
-            )
-        ''')
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO tasks 
-            (id, name, payload, priority, status, created_at, started_at, completed_at, 
-             result, error_message, processing_time_ms, retry_count)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            task['id'],
-            task['name'],
-            json.dumps(task['payload']),
-            task['priority'],
-            task['status'],
-            task['created_at'],
-            task.get('started_at'),
-            task.get('completed_at'),
-            json.dumps(task.get('result')) if task.get('result') else None,
-            task.get('error_message'),
-            task.get('processing_time_ms'),
-            task.get('retry_count', 0)
-        ))
-        
-        conn.commit()
-        conn.close()
-        
+        await _run_db(_save_rows, [_task_row(task) for task in tasks])
     except Exception as e:
-        logger.error(f"Failed to save task to database: {e}")
+        logger.error(f"Failed to save {len(tasks)} task(s) to database: {e}")
 
 
 async def get_task_status(task_id: str) -> Optional[Dict[str, Any]]:
     """Fetch persisted task row -> status dict."""
     try:
-        conn = sqlite3.connect('task_scheduler.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = await _run_db(_fetch_row, task_id)
         
         if row:
             return {
@@ -510,7 +1083,7 @@ async def get_task_status(task_id: str) -> Optional[Dict[str, Any]]:
                 'status': row[4],
                 'started_at': row[6],
                 'completed_at': row[7],
-                'result': json.loads(row[8]) if row[8] else None,
+                'result': orjson.loads(row[8]) if row[8] else None,
                 'error_message': row[9],
                 'processing_time_ms': row[10],
                 'retry_count': row[11]
@@ -523,32 +1096,33 @@ async def get_task_status(task_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+# Last process-level snapshots and when they were taken (monotonic seconds)
+_worker_stats_at = float('-inf')
+_worker_stats: Dict[str, Any] = {}
+_system_metrics_at = float('-inf')
+_system_metrics: Dict[str, Any] = {}
+
+
 async def get_worker_stats() -> Dict[str, Any]:
-    """Return minimal process-level worker stats."""
+    """Return minimal process-level worker stats, cached for SYSTEM_STATS_TTL."""
+    global _worker_stats_at, _worker_stats
     # This is a simplified version - in a real system you'd track more details
-    return {
-        'active_workers': mp.active_children().__len__(),
-        'system_load': psutil.getloadavg()[0] if hasattr(psutil, 'getloadavg') else 0
-    }
+    now = time.monotonic()
+    if now - _worker_stats_at >= SYSTEM_STATS_TTL:
+        # active_children() also reaps finished children, so it is worth rate-limiting
+        _worker_stats = {
+            'active_workers': mp.active_children().__len__(),
+            'system_load': psutil.getloadavg()[0] if hasattr(psutil, 'getloadavg') else 0
+        }
+        _worker_stats_at = now
+    return dict(_worker_stats)
 
 
 async def cleanup_completed_tasks(older_than_hours: int = 24):
     """Delete completed/failed/cancelled tasks older than cutoff."""
     try:
-        conn = sqlite3.connect('task_scheduler.db')
-        cursor = conn.cursor()
-        
         cutoff_time = (datetime.now() - timedelta(hours=older_than_hours)).isoformat()
-        
-        cursor.execute('''
-            DELETE FROM tasks 
-            WHERE status IN ('completed', 'failed', 'cancelled') 
-            AND completed_at < ?
-        ''', (cutoff_time,))
-        
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        deleted_count = await _run_db(_delete_finished, cutoff_time)
         
         logger.info(f"Cleaned up {deleted_count} old tasks")
         
@@ -556,22 +1130,33 @@ async def cleanup_completed_tasks(older_than_hours: int = 24):
         logger.error(f"Failed to cleanup tasks: {e}")
 
 
+# Prime psutil's CPU counter; each non-blocking read then covers the time
+# since the previous one (the first, since import)
+psutil.cpu_percent(interval=None)
+
+
 async def get_system_metrics() -> Dict[str, Any]:
-    """Return basic system performance metrics (CPU, memory, uptime)."""
+    """Return basic system performance metrics (CPU, memory, uptime), cached for SYSTEM_STATS_TTL."""
+    global _system_metrics_at, _system_metrics
+    now = time.monotonic()
+    if now - _system_metrics_at < SYSTEM_STATS_TTL:
+        return dict(_system_metrics)
     try:
-        # Get system metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # Get system metrics; interval=None returns at once instead of sleeping 1s
+        cpu_percent = psutil.cpu_percent(interval=None)
         memory = psutil.virtual_memory()
         
         # Calculate uptime (simplified)
         uptime = time.time() - psutil.boot_time()
         
-        return {
+        _system_metrics = {
             'uptime_seconds': uptime,
             'cpu_usage_percent': cpu_percent,
             'memory_usage_mb': memory.used / (1024 * 1024),
             'memory_total_mb': memory.total / (1024 * 1024)
         }
+        _system_metrics_at = now
+        return dict(_system_metrics)
         
     except Exception as e:
         logger.error(f"Failed to get system metrics: {e}")